@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentprofile',
+            name='resume_sha256',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='studentprofile',
+            name='resume_text',
+            field=models.TextField(blank=True),
+        ),
+    ]
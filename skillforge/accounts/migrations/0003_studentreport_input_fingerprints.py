@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_studentprofile_resume_sha256_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentreport',
+            name='input_fingerprints',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:42
+
+import json
+import re
+
+from django.db import migrations, models
+
+# frozen copy of langchain_utils.normalize_final_analysis as of this
+# migration, so later changes to the app code can't change what it does
+RECOMMENDED_TAGS = ("Beginner", "Intermediate", "Expert")
+
+
+def _string_list(value):
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def normalize_final_analysis(data):
+    if isinstance(data, str):
+        cleaned = re.sub(r"```[\w]*", "", data).strip()
+        try:
+            data = json.loads(cleaned)
+        except json.JSONDecodeError:
+            start, end = cleaned.find("{"), cleaned.rfind("}")
+            if start == -1 or end <= start:
+                raise
+            data = json.loads(cleaned[start:end + 1])
+    if not isinstance(data, dict):
+        raise ValueError("final_analysis did not return a JSON object")
+
+    try:
+        rating = float(data.get("star_rating"))
+    except (TypeError, ValueError):
+        raise ValueError("final_analysis returned no numeric star_rating")
+
+    tags = [
+        tag.capitalize() for tag in _string_list(data.get("recommended_tags"))
+        if tag.capitalize() in RECOMMENDED_TAGS
+    ]
+
+    return {
+        "star_rating": round(min(max(rating, 1.0), 5.0), 1),
+        "strengths": _string_list(data.get("strengths")),
+        "weaknesses": _string_list(data.get("weaknesses")),
+        "recommended_tags": tags,
+    }
+
+
+def parse_final_analyses(apps, schema_editor):
+    # reports written before this migration stored the raw model output
+    StudentReport = apps.get_model("accounts", "StudentReport")
+
+    for report in StudentReport.objects.filter(report_summary__has_key="final").iterator():
+        final = report.report_summary.get("final")
+        if not final:
+            continue
+
+        try:
+            final = normalize_final_analysis(final)
+        except ValueError:
+            continue
+
+        report.report_summary["final"] = final
+        report.star_rating = final["star_rating"]
+        report.recommended_tag = next(iter(final["recommended_tags"]), "")
+        report.save(update_fields=["report_summary", "star_rating", "recommended_tag"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_studentreport_input_fingerprints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentreport',
+            name='recommended_tag',
+            field=models.CharField(blank=True, db_index=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='studentreport',
+            name='star_rating',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(parse_final_analyses, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_clientprofile_updated_at_studentprofile_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentprofile',
+            name='match_vector',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='studentprofile',
+            name='match_vector_vocabulary',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
@@ -50,6 +50,8 @@ class User(AbstractBaseUser, PermissionsMixin):
 
 
 class StudentProfile(models.Model):
+    MATCH_FIELDS = ("skills", "education", "experience_level")
+
     user = models.OneToOneField(
         User,
         on_delete=models.CASCADE,
@@ -69,11 +71,21 @@ class StudentProfile(models.Model):
 
     resume = models.FileField(upload_to="resumes/", blank=True, null=True)
 
+    # text extracted from `resume`, reused while the file hash matches
+    resume_sha256 = models.CharField(max_length=64, blank=True)
+    resume_text = models.TextField(blank=True)
+
     skills = models.TextField(blank=True)
 
     rating = models.DecimalField(max_digits=2, decimal_places=1, default=0.0)
 
+    # job-matching TF-IDF vector of MATCH_FIELDS (see project.matching),
+    # {"i": [term ids], "v": [weights]}; cleared when those fields change
+    match_vector = models.JSONField(default=dict, blank=True)
+    match_vector_vocabulary = models.IntegerField(null=True, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.user.email} - Student"
@@ -117,6 +129,13 @@ class StudentReport(models.Model):
 
     report_summary = models.JSONField(default=dict)
 
+    # copied out of report_summary["final"] so they can be filtered on
+    star_rating = models.FloatField(null=True, blank=True, db_index=True)
+    recommended_tag = models.CharField(max_length=20, blank=True, db_index=True)
+
+    # hashes of the inputs each part of report_summary was built from
+    input_fingerprints = models.JSONField(default=dict, blank=True)
+
     generated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
@@ -144,6 +163,7 @@ class ClientProfile(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.company_name
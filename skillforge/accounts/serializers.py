@@ -33,7 +33,32 @@ class LoginSerializer(serializers.Serializer):
 
 
 
-class StudentOnboardingSerializer(serializers.ModelSerializer):
+class MatchVectorMixin:
+    """
+    Drops the cached job-matching vector when its source fields change,
+    and queues a rescore of the student's job applications.
+    """
+
+    def update(self, instance, validated_data):
+        changed = any(
+            field in validated_data and validated_data[field] != getattr(instance, field)
+            for field in StudentProfile.MATCH_FIELDS
+        )
+        if changed:
+            instance.match_vector = {}
+            instance.match_vector_vocabulary = None
+
+        instance = super().update(instance, validated_data)
+
+        if changed and instance.job_applications.exists():
+            from project.matching import schedule_match_scores
+            schedule_match_scores(student_id=instance.id)
+
+        return instance
+
+
+
+class StudentOnboardingSerializer(MatchVectorMixin, serializers.ModelSerializer):
     class Meta:
         model = StudentProfile
         fields = [
@@ -73,7 +98,7 @@ class ClientOnboardingSerializer(serializers.ModelSerializer):
 from rest_framework import serializers
 from .models import StudentProfile, ClientProfile
 
-class StudentProfileSerializer(serializers.ModelSerializer):
+class StudentProfileSerializer(MatchVectorMixin, serializers.ModelSerializer):
     email = serializers.EmailField(source="user.email", read_only=True)
 
     class Meta:
@@ -3,7 +3,9 @@ from rest_framework.response import Response
 from rest_framework import status, permissions
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import IsAuthenticated
-from verification.services import generate_partial_report
+from verification.services import enqueue_partial_report, report_input_values, report_inputs_changed
+from verification.utils.http_cache import conditional_get
+from .models import StudentProfile, ClientProfile
 
 
 from .serializers import (
@@ -86,7 +88,10 @@ class OnboardingAPI(APIView):
 
         serializer.is_valid(raise_exception=True)
         serializer.save()
-        generate_partial_report(user.id)
+
+        job = None
+        if user.role == "student":
+            job = enqueue_partial_report(user)
 
         user.onboarding_stage = 2
         user.verified = True
@@ -94,10 +99,23 @@ class OnboardingAPI(APIView):
 
         return Response({
             "message": "Onboarding completed successfully",
-            "profile": serializer.data
+            "profile": serializer.data,
+            "report_job_id": job.id if job else None
         })
+def _profile_version(request):
+    user = request.user
+    model = {"student": StudentProfile, "client": ClientProfile}.get(user.role)
+    if model is None:
+        return None
+
+    changed = model.objects.filter(user=user).values_list("updated_at", flat=True).first()
+    # email is serialised from the user row, which is already loaded
+    return [changed, user.email] if changed else None
+
+
 class ProfileAPI(APIView):
     permission_classes = [IsAuthenticated]
+    @conditional_get(_profile_version)
     def get(self, request):
         user = request.user
         if user.role == "student":
@@ -126,13 +144,19 @@ class ProfileUpdateAPI(APIView):
         else:
             return Response({"error": "Invalid role"}, status=400)
         serializer.is_valid(raise_exception=True)
+
+        # the client sends github_url on every PATCH, so compare values
+        before = report_input_values(user.student_profile) if user.role == "student" else None
         serializer.save()
-        generate_partial_report(user.id)
 
+        job = None
+        if user.role == "student" and report_inputs_changed(user.student_profile, before):
+            job = enqueue_partial_report(user)
 
         return Response({
             "message": "Profile updated",
-            "data": serializer.data
+            "data": serializer.data,
+            "report_job_id": job.id if job else None
         })
 
 class LogoutAPI(APIView):
@@ -1,22 +1,7 @@
-from langchain.prompts import PromptTemplate
-from langchain_google_genai import GoogleGenerativeAI, ChatGoogleGenerativeAI
-from langchain_core.output_parsers import StrOutputParser, JsonOutputParser
-from dotenv import load_dotenv
-import os
-load_dotenv()
-API_KEY = os.getenv("GEMINI_API_KEY")
-if not API_KEY:
-    raise ValueError("GEMINI_API_KEY or GOOGLE_API_KEY is missing. Set it in your .env file.")
-model = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",   
-    api_key=API_KEY
-)
-
-
-
-module_prompt = PromptTemplate(
-    input_variables=["topic", "level"],
-    template="""
+from verification.utils.llm import parse_json, run_prompt, stream_prompt
+
+
+module_prompt = """
 You are an expert educator.
 
 Create a learning module.
@@ -36,17 +21,28 @@ Return ONLY JSON:
   }}
 }}
 """
-)
-
 
-parser = StrOutputParser()
 
+def normalize_learning_module(data) -> dict:
+    """Parsed {"content": str, "metadata": dict}; ValueError if unusable."""
+    if isinstance(data, str):
+        data = parse_json(data)
+    if not isinstance(data, dict) or not isinstance(data.get("content"), str):
+        raise ValueError("Learning module has no content")
 
-module_chain = module_prompt | model | parser
+    metadata = data.get("metadata")
+    return {
+        "content": data["content"],
+        "metadata": metadata if isinstance(metadata, dict) else {},
+    }
 
 
-def generate_learning_module(topic: str, level: str):
-    return module_chain.invoke({
+def generate_learning_module(topic: str, level: str, stream=False):
+    inputs = {
         "topic": topic,
         "level": level
-    })
+    }
+    parser = normalize_learning_module
+    if stream:
+        return stream_prompt("generate_learning_module", module_prompt, inputs, parser=parser)
+    return run_prompt("generate_learning_module", module_prompt, inputs, parser=parser)
@@ -1,30 +1,25 @@
 from .models import UpskillModule
-from .langchain_utils import generate_learning_module
+from .langchain_utils import generate_learning_module, normalize_learning_module
 from accounts.models import *
+from verification.utils.llm_limiter import llm_user
 from .models import *
-def generate_upskill_module(student_id: int, topic: str):
-
-    user = User.objects.get(id=student_id)
+def _module_level(user):
 
     report = StudentReport.objects.get(student=user.student_profile)
 
     score = report.personality_score or 0
 
     if score >= 24:
-        level = "fast"
+        return "fast"
     elif score >= 16:
-        level = "average"
-    else:
-        level = "slow"
+        return "average"
+    return "slow"
 
-    result = generate_learning_module(topic, level)
 
-    if isinstance(result, str):
-        import re
-        import json
-        cleaned = re.sub(r"```[\w]*", "", result) 
-        cleaned = cleaned.strip()
-        result = json.loads(cleaned)
+def _save_module(user, topic, level, result):
+
+    # no-op for fresh results; older cache entries hold the raw text
+    result = normalize_learning_module(result)
 
     module = UpskillModule.objects.create(
     user=user,
@@ -38,5 +33,35 @@ def generate_upskill_module(student_id: int, topic: str):
     return module
 
 
+def generate_upskill_module(student_id: int, topic: str):
+
+    user = User.objects.get(id=student_id)
+
+    level = _module_level(user)
+
+    with llm_user(user.id):
+        result = generate_learning_module(topic, level)
+
+    return _save_module(user, topic, level, result)
+
+
+def stream_upskill_module(student_id: int, topic: str):
+    """
+    Yields ("token", text) as the module is written, then
+    ("module", UpskillModule) once it has been saved.
+    """
+
+    user = User.objects.get(id=student_id)
+
+    level = _module_level(user)
+
+    with llm_user(user.id):
+        for event, value in generate_learning_module(topic, level, stream=True):
+            if event == "token":
+                yield "token", value
+            else:
+                yield "module", _save_module(user, topic, level, value)
+
+
 def list_user_modules(student_id: int):
     return UpskillModule.objects.filter(user_id=student_id).order_by("-created_at")
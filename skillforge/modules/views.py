@@ -1,10 +1,20 @@
 from .serializers import UpskillModuleSerializer
-from .services import generate_upskill_module, list_user_modules
+from .services import generate_upskill_module, stream_upskill_module, list_user_modules
+from verification.utils.sse import wants_stream, sse_event, sse_response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.db.models import Count, Max
+from verification.utils.http_cache import conditional_get
 from .models import UpskillModule
 
+
+def _modules_version(request):
+    # modules are never edited, only added or deleted
+    return UpskillModule.objects.filter(user=request.user).aggregate(
+        created=Max("created_at"), count=Count("id")
+    )
+
 class GenerateUpskillModuleAPI(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -15,6 +25,9 @@ class GenerateUpskillModuleAPI(APIView):
         if not topic:
             return Response({"error": "topic required"}, status=400)
 
+        if wants_stream(request):
+            return sse_response(self.stream(request.user.id, topic))
+
         module = generate_upskill_module(request.user.id, topic)
 
         return Response({
@@ -23,10 +36,26 @@ class GenerateUpskillModuleAPI(APIView):
             "level": module.level
         })
 
+    def stream(self, user_id, topic):
+        try:
+            for event, value in stream_upskill_module(user_id, topic):
+                if event == "token":
+                    yield sse_event("token", value)
+                else:
+                    yield sse_event("done", {
+                        "module_id": value.id,
+                        "topic": value.topic,
+                        "level": value.level
+                    })
+
+        except Exception:
+            yield sse_event("error", {"error": "Failed to generate module"})
+
 
 class ListUpskillModulesAPI(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_get(_modules_version)
     def get(self, request):
 
         modules = list_user_modules(request.user.id)
@@ -4,6 +4,7 @@ class Exam(models.Model):
     title = models.CharField(max_length=200)
     duration_minutes = models.PositiveIntegerField()
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.title
@@ -17,6 +18,7 @@ class Question(models.Model):
     option_c = models.CharField(max_length=200)
     option_d = models.CharField(max_length=200)
     correct_option = models.CharField(max_length=1)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.text[:50]
@@ -2,16 +2,31 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.db.models import Count, Max
 from django.utils import timezone
 from .models import Exam, Question, ExamSession, ProctorEvent
 from .serializers import ExamSerializer, QuestionSerializer
 from .risk import update_risk
+from verification.utils.http_cache import conditional_get
 from django.shortcuts import render
 
 def proctor_test(request):
     return render(request, "proctor.html")
+def _exams_version(request):
+    return Exam.objects.filter(is_active=True).aggregate(
+        changed=Max("updated_at"), count=Count("id")
+    )
+
+
+def _questions_version(request, exam_id):
+    return Question.objects.filter(exam_id=exam_id).aggregate(
+        changed=Max("updated_at"), count=Count("id")
+    )
+
+
 class ExamListView(APIView):
     permission_classes = [IsAuthenticated]
+    @conditional_get(_exams_version)
     def get(self, request):
         exams = Exam.objects.filter(is_active=True)
         serializer = ExamSerializer(exams, many=True)
@@ -43,6 +58,7 @@ class StartExamView(APIView):
 
 class ExamQuestionView(APIView): 
     permission_classes = [IsAuthenticated]
+    @conditional_get(_questions_version)
     def get(self, request, exam_id):
         try:
             questions = Question.objects.filter(exam_id=exam_id)
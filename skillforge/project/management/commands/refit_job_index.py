@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from project.matching import refit_job_index, schedule_refit
+
+
+class Command(BaseCommand):
+    help = "Refit the job matching vocabulary over open jobs and re-vector every job"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queue",
+            action="store_true",
+            help="Queue a refit job for the worker instead of running it here",
+        )
+
+    def handle(self, *args, **options):
+        if options["queue"]:
+            job = schedule_refit()
+            self.stdout.write(f"Queued refit job #{job.id}")
+            return
+
+        vocabulary = refit_job_index()
+        if vocabulary is None:
+            self.stdout.write("No open jobs, nothing to fit")
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Fitted {len(vocabulary.idf)} terms over {vocabulary.job_count} open job(s)"
+        ))
@@ -0,0 +1,395 @@
+"""
+TF-IDF matching between students and open jobs.
+
+The vocabulary and IDF are fitted over open jobs and stored in
+MatchVocabulary; every JobPost keeps its own sparse vector, refreshed
+by a post_save signal. Each process holds the open-job vectors as one
+CSR matrix, so scoring a student is a single sparse dot product.
+Student vectors are cached on StudentProfile in the same sparse form.
+sklearn and scipy are imported on first use only.
+"""
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+from accounts.models import StudentProfile
+from .models import JobApplication, JobPost, MatchVocabulary
+
+_lock = threading.Lock()
+_index = None
+_vectorizer = (None, None)  # (vocabulary id, TfidfVectorizer)
+
+
+def current_vocabulary_id():
+    return MatchVocabulary.objects.order_by("-id").values_list("id", flat=True).first()
+
+
+def live_vocabulary_id():
+    """The live vocabulary id, fitting one first if there is none yet."""
+    vocabulary_id = current_vocabulary_id()
+    if vocabulary_id is None:
+        vocabulary = refit_job_index()
+        vocabulary_id = vocabulary.id if vocabulary else None
+    return vocabulary_id
+
+
+def get_vectorizer(vocabulary_id: int):
+    """
+    A TfidfVectorizer rebuilt from the stored vocabulary and IDF. The
+    (large) vocabulary row is only read when the live one changed.
+    """
+    global _vectorizer
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    with _lock:
+        cached_id, vectorizer = _vectorizer
+        if cached_id == vocabulary_id:
+            return vectorizer
+
+    vocabulary = MatchVocabulary.objects.get(id=vocabulary_id)
+    vectorizer = TfidfVectorizer(vocabulary=vocabulary.vocabulary)
+    vectorizer.idf_ = np.asarray(vocabulary.idf)
+
+    with _lock:
+        _vectorizer = (vocabulary_id, vectorizer)
+    return vectorizer
+
+
+def encode(row):
+    """One row of a sparse matrix as JSON: {"i": columns, "v": weights}."""
+    return {
+        "i": row.indices.tolist(),
+        "v": [round(float(value), 6) for value in row.data],
+    }
+
+
+def stack(vectors, width):
+    """CSR matrix with one row per encoded vector."""
+    import numpy as np
+    from scipy.sparse import csr_matrix
+
+    indptr = [0]
+    indices = []
+    data = []
+    for vector in vectors:
+        indices.extend(vector.get("i", []))
+        data.extend(vector.get("v", []))
+        indptr.append(len(indices))
+
+    return csr_matrix(
+        (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+        shape=(len(vectors), width)
+    )
+
+
+def student_match_text(student):
+    return " ".join(getattr(student, field) or "" for field in StudentProfile.MATCH_FIELDS)
+
+
+def student_vectors(students, vocabulary_id):
+    """
+    Match vectors of `students` as a CSR matrix (rows in order). Vectors
+    missing or built with an older vocabulary are computed in one
+    transform and cached on the profile.
+    """
+    vectorizer = get_vectorizer(vocabulary_id)
+
+    missing = [s for s in students if s.match_vector_vocabulary != vocabulary_id]
+    if missing:
+        rows = vectorizer.transform([student_match_text(s) for s in missing])
+
+        for student, row in zip(missing, rows):
+            student.match_vector = encode(row)
+            student.match_vector_vocabulary = vocabulary_id
+
+            # skip the write if the profile was edited since it was read
+            StudentProfile.objects.filter(id=student.id, updated_at=student.updated_at).update(
+                match_vector=student.match_vector,
+                match_vector_vocabulary=vocabulary_id
+            )
+
+    return stack([s.match_vector for s in students], len(vectorizer.vocabulary_))
+
+
+def job_vector(job: JobPost, vocabulary_id):
+    vectorizer = get_vectorizer(vocabulary_id)
+    if job.vector_vocabulary == vocabulary_id:
+        return stack([job.vector], len(vectorizer.vocabulary_))
+    return vectorizer.transform([job.match_text()])
+
+
+def rank_students(job: JobPost, students):
+    """Cosine similarity of each student with `job`, as a numpy array."""
+    import numpy as np
+
+    vocabulary_id = live_vocabulary_id()
+    if vocabulary_id is None or not students:
+        return np.zeros(len(students))
+
+    matrix = student_vectors(students, vocabulary_id)
+    return (matrix @ job_vector(job, vocabulary_id).T).toarray().ravel()
+
+
+def schedule_match_scores(job_id=None, student_id=None):
+    """Queue a match_score refresh for one job's or one student's applications."""
+    from verification.jobs import enqueue
+
+    if job_id is not None:
+        return enqueue(
+            "match_scores",
+            "project.matching.refresh_job_match_scores",
+            dedupe_key=f"match_scores:job:{job_id}",
+            job_id=job_id
+        )
+
+    return enqueue(
+        "match_scores",
+        "project.matching.refresh_student_match_scores",
+        dedupe_key=f"match_scores:student:{student_id}",
+        student_id=student_id
+    )
+
+
+def schedule_refit():
+    from verification.jobs import enqueue
+
+    return enqueue(
+        "job_index_refit",
+        "project.matching.refit_job_index",
+        dedupe_key="job_index_refit"
+    )
+
+
+def index_job_post(job: JobPost):
+    """Refresh one job's vector against the live vocabulary (post_save)."""
+    vocabulary_id = current_vocabulary_id()
+    if vocabulary_id is None:
+        schedule_refit()
+        return
+
+    vector = get_vectorizer(vocabulary_id).transform([job.match_text()])
+
+    # bump updated_at after the vector is written, so other processes
+    # never cache a matrix keyed on this save but holding the old vector
+    JobPost.objects.filter(id=job.id).update(
+        vector=encode(vector.getrow(0)),
+        vector_vocabulary=vocabulary_id,
+        updated_at=timezone.now()
+    )
+    invalidate_job_index()
+
+    if job.applications.exists():
+        schedule_match_scores(job_id=job.id)
+
+    # terms that first appear in new jobs are missing until the next fit
+    vocabulary = MatchVocabulary.objects.filter(id=vocabulary_id)
+    vocabulary.update(updates_since_fit=F("updates_since_fit") + 1)
+    updates = vocabulary.values_list("updates_since_fit", flat=True).first() or 0
+    if updates >= getattr(settings, "JOB_INDEX_REFIT_AFTER", 50):
+        schedule_refit()
+
+
+def refit_job_index(batch_size: int = 500):
+    """
+    Fit a new vocabulary over open jobs and re-vector every job.
+    Returns the new MatchVocabulary, or None when there are no open jobs.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    texts = [
+        job.match_text()
+        for job in JobPost.objects.filter(status="open")
+                                  .only("title", "description", "skills_required")
+                                  .iterator(chunk_size=batch_size)
+    ]
+    if not texts:
+        return None
+
+    fitted = TfidfVectorizer().fit(texts)
+
+    with transaction.atomic():
+        vocabulary = MatchVocabulary.objects.create(
+            vocabulary={term: int(column) for term, column in fitted.vocabulary_.items()},
+            idf=fitted.idf_.tolist(),
+            job_count=len(texts)
+        )
+        vectorizer = get_vectorizer(vocabulary.id)
+
+        # closed jobs too, so a reopened job is ready straight away
+        jobs = JobPost.objects.only("id", "title", "description", "skills_required")
+        batch = []
+        for job in jobs.iterator(chunk_size=batch_size):
+            batch.append(job)
+            if len(batch) >= batch_size:
+                _revector(batch, vectorizer, vocabulary)
+                batch = []
+        if batch:
+            _revector(batch, vectorizer, vocabulary)
+
+        MatchVocabulary.objects.exclude(id=vocabulary.id).delete()
+
+    invalidate_job_index()
+
+    # every stored score is relative to the old vocabulary
+    for job_id in JobApplication.objects.values_list("job_id", flat=True).distinct().iterator():
+        refresh_job_match_scores(job_id, batch_size)
+
+    return vocabulary
+
+
+def _revector(jobs, vectorizer, vocabulary):
+    vectors = vectorizer.transform([job.match_text() for job in jobs])
+
+    for job, row in zip(jobs, vectors):
+        job.vector = encode(row)
+        job.vector_vocabulary = vocabulary.id
+
+    JobPost.objects.bulk_update(jobs, ["vector", "vector_vocabulary"])
+
+
+def score_applications(applications):
+    """
+    Compute and store match_score (0-100) for `applications`, which need
+    `job` and `student` loaded. One multiply per job.
+    """
+    by_job = {}
+    for application in applications:
+        by_job.setdefault(application.job_id, []).append(application)
+
+    for group in by_job.values():
+        scores = rank_students(group[0].job, [application.student for application in group])
+        for application, score in zip(group, scores):
+            application.match_score = round(float(score) * 100, 2)
+
+    JobApplication.objects.bulk_update(applications, ["match_score"], batch_size=500)
+
+
+def refresh_job_match_scores(job_id, batch_size=1000):
+    applications = JobApplication.objects.filter(job_id=job_id)\
+                                         .select_related("job", "student")\
+                                         .order_by("id")
+    batch = []
+    for application in applications.iterator(chunk_size=batch_size):
+        batch.append(application)
+        if len(batch) >= batch_size:
+            score_applications(batch)
+            batch = []
+    if batch:
+        score_applications(batch)
+
+
+def refresh_student_match_scores(student_id):
+    score_applications(list(
+        JobApplication.objects.filter(student_id=student_id).select_related("job", "student")
+    ))
+
+
+def ensure_match_scores(job: JobPost):
+    """Score applications that predate match_score (or were missed)."""
+    missing = list(job.applications.filter(match_score=None).select_related("job", "student"))
+    if missing:
+        score_applications(missing)
+
+
+def top_k(scores, ids, k, after=None):
+    """
+    Positions of the `k` best entries ordered by (score, id) descending,
+    optionally only those ranked after the `after` = (score, id) cursor.
+    Uses a partition, so only the selected entries are sorted.
+    """
+    import numpy as np
+
+    scores = np.asarray(scores, dtype=np.float64)
+    ids = np.asarray(ids)
+
+    candidates = np.arange(len(scores))
+    if after is not None:
+        score, last_id = after
+        candidates = np.flatnonzero((scores < score) | ((scores == score) & (ids < last_id)))
+
+    if len(candidates) > k:
+        values = scores[candidates]
+        kth = np.partition(values, len(values) - k)[len(values) - k]
+        # keep every tie with the k-th score so ids decide between them
+        candidates = candidates[values >= kth]
+
+    order = np.lexsort((-ids[candidates], -scores[candidates]))[:k]
+    return candidates[order]
+
+
+class JobIndex:
+    """Open-job vectors as a CSR matrix; rows follow `job_ids`."""
+
+    def __init__(self, key, vocabulary_id, job_ids, matrix):
+        self.key = key
+        self.vocabulary_id = vocabulary_id
+        self.job_ids = job_ids
+        self.matrix = matrix
+
+    def student_vector(self, student):
+        return student_vectors([student], self.vocabulary_id)
+
+    def scores(self, vector):
+        """Cosine similarity of every open job with `vector` (rows are L2-normalised)."""
+        return (self.matrix @ vector.T).toarray().ravel()
+
+
+def _build_index(key, vocabulary_id):
+    vectorizer = get_vectorizer(vocabulary_id)
+
+    rows = list(
+        JobPost.objects.filter(status="open")
+                       .order_by("id")
+                       .values_list("id", "vector", "vector_vocabulary")
+    )
+
+    # saved mid-refit, or before the first fit
+    stale = [job_id for job_id, _, built_with in rows if built_with != vocabulary_id]
+    if stale:
+        fresh = {
+            job.id: encode(vectorizer.transform([job.match_text()]).getrow(0))
+            for job in JobPost.objects.filter(id__in=stale)
+        }
+        rows = [(job_id, fresh.get(job_id, vector), vocabulary_id) for job_id, vector, _ in rows]
+
+    matrix = stack([vector for _, vector, _ in rows], len(vectorizer.vocabulary_))
+
+    return JobIndex(key, vocabulary_id, [job_id for job_id, _, _ in rows], matrix)
+
+
+def get_job_index():
+    """
+    The process-wide JobIndex, rebuilt from stored vectors only when the
+    vocabulary or the set of open jobs changed. None without open jobs.
+    """
+    global _index
+
+    vocabulary_id = live_vocabulary_id()
+    if vocabulary_id is None:
+        return None
+
+    state = JobPost.objects.filter(status="open").aggregate(
+        count=Count("id"), changed=Max("updated_at")
+    )
+    key = (vocabulary_id, state["count"], state["changed"])
+
+    with _lock:
+        if _index is not None and _index.key == key:
+            return _index
+
+    index = _build_index(key, vocabulary_id)
+
+    with _lock:
+        _index = index
+    return index
+
+
+def invalidate_job_index():
+    global _index
+
+    with _lock:
+        _index = None
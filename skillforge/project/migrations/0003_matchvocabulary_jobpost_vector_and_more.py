@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_clientprofile_updated_at_studentprofile_updated_at'),
+        ('project', '0002_jobapplication'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchVocabulary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vocabulary', models.JSONField(default=dict)),
+                ('idf', models.JSONField(default=list)),
+                ('job_count', models.IntegerField(default=0)),
+                ('updates_since_fit', models.IntegerField(default=0)),
+                ('fitted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='vector',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='vector_vocabulary',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='jobpost',
+            index=models.Index(fields=['status', 'updated_at'], name='project_job_status_b497a1_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_studentprofile_match_vector_and_more'),
+        ('project', '0003_matchvocabulary_jobpost_vector_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='match_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['job', 'match_score'], name='project_job_job_id_32f0b6_idx'),
+        ),
+    ]
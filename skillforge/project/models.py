@@ -1,6 +1,12 @@
 from django.db import models
 from accounts.models import ClientProfile
 
+class JobPostQuerySet(models.QuerySet):
+    def with_applicant_count(self):
+        """Annotate `applications_count` so listings don't COUNT per row."""
+        return self.annotate(applications_count=models.Count("applications"))
+
+
 class JobPost(models.Model):
     CATEGORY_CHOICES = [
         ('Web Development', 'Web Development'),
@@ -40,9 +46,40 @@ class JobPost(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # sparse TF-IDF vector {"i": [term ids], "v": [weights]} under `vector_vocabulary`
+    vector = models.JSONField(default=dict, blank=True)
+    vector_vocabulary = models.IntegerField(null=True, blank=True)
+
+    objects = JobPostQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # open-job count / last change, checked on every match request
+            models.Index(fields=["status", "updated_at"]),
+        ]
+
     def __str__(self):
         return f"{self.title} - {self.client.company_name}"
 
+    def match_text(self):
+        return f"{self.title} {self.description} {self.skills_required}"
+
+
+class MatchVocabulary(models.Model):
+    """
+    A fitted TF-IDF vocabulary and IDF for job matching. The newest row
+    is the live one; JobPost vectors are built against it.
+    """
+    vocabulary = models.JSONField(default=dict)  # term -> column
+    idf = models.JSONField(default=list)
+    job_count = models.IntegerField(default=0)
+    # job saves since the fit; a refit is queued past JOB_INDEX_REFIT_AFTER
+    updates_since_fit = models.IntegerField(default=0)
+    fitted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Vocabulary #{self.id} ({len(self.idf)} terms)"
+
 
 class JobApplication(models.Model):
     STATUS_CHOICES = [
@@ -56,8 +93,31 @@ class JobApplication(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     applied_at = models.DateTimeField(auto_now_add=True)
 
+    # 0-100 similarity of student and job, kept current by project.matching
+    match_score = models.FloatField(null=True, blank=True)
+
     class Meta:
         unique_together = ('job', 'student')
+        indexes = [
+            models.Index(fields=['job', 'match_score']),
+        ]
 
     def __str__(self):
         return f"{self.student.user.email} -> {self.job.title}"
+
+
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+@receiver(post_save, sender=JobPost)
+def index_job(sender, instance, **kwargs):
+    from .matching import index_job_post
+    index_job_post(instance)
+
+
+@receiver(post_delete, sender=JobPost)
+def unindex_job(sender, instance, **kwargs):
+    from .matching import invalidate_job_index
+    invalidate_job_index()
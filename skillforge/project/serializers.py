@@ -17,7 +17,11 @@ class JobPostSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'company_name', 'applicant_count']
 
     def get_applicant_count(self, obj):
-        return obj.applications.count()
+        # listing querysets annotate this (see JobPost.objects.with_applicant_count)
+        count = getattr(obj, "applications_count", None)
+        if count is None:
+            count = obj.applications.count()
+        return count
 
     def create(self, validated_data):
         return JobPost.objects.create(**validated_data)
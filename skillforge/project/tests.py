@@ -1,3 +1,37 @@
-from django.test import TestCase
+import numpy as np
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from .matching import top_k
+
+
+class TopKTests(SimpleTestCase):
+    def ranked(self, scores, ids):
+        # reference order: (score, id) descending
+        return sorted(range(len(scores)), key=lambda i: (-scores[i], -ids[i]))
+
+    def test_matches_full_sort(self):
+        rng = np.random.default_rng(0)
+        scores = rng.integers(0, 5, 200) / 4  # plenty of ties
+        ids = rng.permutation(1000)[:200]
+
+        expected = self.ranked(scores.tolist(), ids.tolist())
+        self.assertEqual(top_k(scores, ids, 10).tolist(), expected[:10])
+        self.assertEqual(top_k(scores, ids, 500).tolist(), expected)
+
+    def test_cursor_pages_cover_everything_once(self):
+        scores = [0.5, 0.9, 0.5, 0.1, 0.9, 0.5]
+        ids = [10, 11, 12, 13, 14, 15]
+
+        seen, after = [], None
+        while True:
+            page = top_k(scores, ids, 2, after)
+            if not len(page):
+                break
+            seen += page.tolist()
+            last = page[-1]
+            after = (scores[last], ids[last])
+
+        self.assertEqual(seen, self.ranked(scores, ids))
+
+    def test_empty(self):
+        self.assertEqual(top_k([], [], 5).tolist(), [])
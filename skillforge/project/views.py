@@ -34,34 +34,53 @@ class ClientJobsAPI(APIView):
 
         try:
             client_profile = request.user.client_profile
-            jobs = JobPost.objects.filter(client=client_profile).order_by('-created_at')
+            jobs = JobPost.objects.filter(client=client_profile)\
+                                  .select_related('client')\
+                                  .with_applicant_count()\
+                                  .order_by('-created_at')
             serializer = JobPostSerializer(jobs, many=True)
             return Response(serializer.data)
         except ClientProfile.DoesNotExist:
             return Response([], status=200)
 
 
+import base64
+import json
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions
-
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from django.db.models import Q
 
 from .models import JobPost
 from .serializers import JobPostSerializer
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from .matching import ensure_match_scores, get_job_index, score_applications, top_k
+
+
+def _encode_cursor(score, job_id):
+    raw = json.dumps([float(score), int(job_id)])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor):
+    score, job_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    return float(score), int(job_id)
 
 
 class AllJobsAPI(APIView):
+    """
+    Open jobs. Students get them ranked by match; with ?limit=N the
+    response is one page {"results", "next_cursor"} and ?cursor= fetches
+    the next one. Without limit the full ranked list is returned.
+    """
     permission_classes = [permissions.IsAuthenticated]
+    max_limit = 100
 
     def get(self, request):
 
         jobs = JobPost.objects.select_related("client")\
-                              .prefetch_related("applications")\
                               .filter(status="open")\
+                              .with_applicant_count()\
                               .order_by("-created_at")
 
         # Non student → normal list
@@ -69,30 +88,41 @@ class AllJobsAPI(APIView):
             serializer = JobPostSerializer(jobs, many=True)
             return Response(serializer.data)
 
-        student = request.user.student_profile
+        limit = request.query_params.get("limit")
+        cursor = request.query_params.get("cursor")
 
-        profile_text = " ".join([
-            student.skills or "",
-            student.education or "",
-            student.experience_level or ""
-        ])
+        try:
+            limit = min(int(limit), self.max_limit) if limit else None
+            after = _decode_cursor(cursor) if cursor else None
+        except (TypeError, ValueError):
+            return Response({"error": "Invalid limit or cursor"}, status=400)
 
-        job_texts = [
-            f"{j.title} {j.description} {j.skills_required}"
-            for j in jobs
-        ]
+        if limit is not None and limit < 1:
+            return Response({"error": "limit must be positive"}, status=400)
+
+        student = request.user.student_profile
 
-        vectorizer = TfidfVectorizer()
-        vectors = vectorizer.fit_transform([profile_text] + job_texts)
+        # one sparse dot product against the prebuilt open-job matrix
+        index = get_job_index()
+        if index is None:
+            return Response({"results": [], "next_cursor": None} if limit else [])
 
-        scores = cosine_similarity(
-            vectors[0:1],
-            vectors[1:]
-        ).flatten()
+        scores = index.scores(index.student_vector(student))
+        job_ids = index.job_ids
+
+        # partial sort: only the requested page is ordered and loaded
+        picked = top_k(scores, job_ids, limit or len(job_ids), after)
+        page = jobs.in_bulk([job_ids[i] for i in picked])
 
         results = []
 
-        for job, score in zip(jobs, scores):
+        for i in picked:
+            job = page.get(job_ids[i])
+            if job is None:
+                # closed since the index was built
+                continue
+
+            score = scores[i]
 
             results.append({
                 # 🔥 EXACT SAME KEYS (unchanged)
@@ -107,15 +137,21 @@ class AllJobsAPI(APIView):
                 "status": job.status,
                 "created_at": job.created_at,
                 "company_name": job.client.company_name if job.client else "",
-                "applicant_count": job.applications.count(),
+                "applicant_count": job.applications_count,
 
                 # ✅ ONLY NEW FIELD
-                "match": round(score * 100, 2)
+                "match": round(float(score) * 100, 2)
             })
 
-        results.sort(key=lambda x: x["match"], reverse=True)
+        if limit is None:
+            return Response(results)
+
+        next_cursor = None
+        if len(picked) == limit:
+            last = picked[-1]
+            next_cursor = _encode_cursor(scores[last], job_ids[last])
 
-        return Response(results)
+        return Response({"results": results, "next_cursor": next_cursor})
 
 class ApplyJobAPI(APIView):
     """Allows a student to apply to a job"""
@@ -142,6 +178,8 @@ class ApplyJobAPI(APIView):
             return Response({"error": "Already applied to this job"}, status=400)
 
         application = JobApplication.objects.create(job=job, student=student_profile)
+        score_applications([application])
+
         return Response({
             "message": "Application submitted successfully",
             "application_id": application.id
@@ -164,12 +202,14 @@ class MyApplicationsAPI(APIView):
         except StudentProfile.DoesNotExist:
             return Response([], status=200)
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-
-
 class JobApplicantsAPI(APIView):
+    """
+    Applicants of a client's job, best match first, from the stored
+    match_score. ?min_match= filters by score (0-100); ?limit= returns
+    one page {"results", "next_cursor"}, continued with ?cursor=.
+    """
     permission_classes = [permissions.IsAuthenticated]
+    max_limit = 100
 
     def get(self, request, job_id):
 
@@ -178,46 +218,46 @@ class JobApplicantsAPI(APIView):
 
         try:
             job = JobPost.objects.select_related("client")\
-                                 .prefetch_related("applications__student__user")\
                                  .get(id=job_id, client=request.user.client_profile)
         except JobPost.DoesNotExist:
             return Response({"error": "Job not found"}, status=404)
 
-        applications = job.applications.all()
-
-        if not applications:
-            return Response([])
+        limit = request.query_params.get("limit")
+        cursor = request.query_params.get("cursor")
+        min_match = request.query_params.get("min_match")
 
-        job_text = f"{job.title} {job.description} {job.skills_required}"
+        try:
+            limit = min(int(limit), self.max_limit) if limit else None
+            after = _decode_cursor(cursor) if cursor else None
+            min_match = float(min_match) if min_match else None
+        except (TypeError, ValueError):
+            return Response({"error": "Invalid limit, cursor or min_match"}, status=400)
 
-      
-        student_texts = []
-        students = []
+        if limit is not None and limit < 1:
+            return Response({"error": "limit must be positive"}, status=400)
 
-        for app in applications:
-            s = app.student
-            students.append(s)
+        ensure_match_scores(job)
 
-            text = " ".join([
-                s.skills or "",
-                s.education or "",
-                s.experience_level or ""
-            ])
+        applications = JobApplication.objects.filter(job=job)\
+                                             .select_related("student__user")\
+                                             .order_by("-match_score", "-id")
 
-            student_texts.append(text)
+        if min_match is not None:
+            applications = applications.filter(match_score__gte=min_match)
 
-       
-        vectorizer = TfidfVectorizer()
-        vectors = vectorizer.fit_transform([job_text] + student_texts)
+        if after is not None:
+            score, last_id = after
+            applications = applications.filter(
+                Q(match_score__lt=score) | Q(match_score=score, id__lt=last_id)
+            )
 
-        scores = cosine_similarity(
-            vectors[0:1],
-            vectors[1:]
-        ).flatten()
+        if limit is not None:
+            applications = applications[:limit]
 
         results = []
 
-        for student, score in zip(students, scores):
+        for application in applications:
+            student = application.student
 
             results.append({
               
@@ -230,9 +270,14 @@ class JobApplicantsAPI(APIView):
                 "github_url": student.github_url,
 
              
-                "match": round(score * 100, 2)
+                "match": application.match_score
             })
 
-        results.sort(key=lambda x: x["match"], reverse=True)
+        if limit is None:
+            return Response(results)
+
+        next_cursor = None
+        if len(results) == limit:
+            next_cursor = _encode_cursor(application.match_score, application.id)
 
-        return Response(results)
+        return Response({"results": results, "next_cursor": next_cursor})
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -60,6 +61,79 @@ REST_FRAMEWORK = {
 }
 AUTH_USER_MODEL = "accounts.User"
 
+# LLM backend: "gemini", "fake" (deterministic, offline) or a dotted path
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+# Chat model used by every LLM prompt (GEMINI_API_KEY comes from the environment)
+LLM_MODEL = "gemini-2.5-flash"
+# artificial latency of the fake backend, in seconds
+LLM_FAKE_LATENCY = float(os.getenv("LLM_FAKE_LATENCY", "0"))
+# extra attempts when a JSON prompt returns unparseable output
+LLM_PARSE_RETRIES = 1
+
+# Concurrency limits for outbound LLM calls
+LLM_LIMITER_ENABLED = True
+LLM_MAX_CONCURRENCY = 8  # across all processes (database slots)
+# one report job needs LLM_MAP_WORKERS chunk summaries plus the GitHub
+# analysis in flight; a higher cap lets one student hold more global slots
+LLM_MAX_CONCURRENCY_PER_USER = 3
+LLM_PROCESS_CONCURRENCY = 4  # per web/worker process
+LLM_QUEUE_TIMEOUT = 30  # seconds a call may wait for a slot
+LLM_LEASE_TTL = 180  # seconds before an abandoned slot is reclaimed
+
+# Prompt budgets, in estimated tokens (~4 characters each)
+LLM_RESUME_TOKEN_BUDGET = 6000  # longer resumes are summarised in chunks first
+LLM_RESUME_CHUNK_TOKENS = 3000
+LLM_GITHUB_TOKEN_BUDGET = 3000
+LLM_GITHUB_PROMPT_REPOS = 30  # top repos by stars, then recent activity
+LLM_MAP_WORKERS = 2  # parallel chunk summaries per resume, capped at LLM_MAX_CONCURRENCY_PER_USER - 1
+
+# per-process LLM metrics are stored in LLMMetricsSnapshot and summed
+LLM_METRICS_FLUSH_INTERVAL = 10  # seconds between snapshot writes
+LLM_METRICS_RETENTION = 60 * 60 * 24 * 7  # drop snapshots of processes gone this long
+
+# one JSON line per LLM call on the "skillforge.llm" logger
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "skillforge.llm": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
+# LLM response cache (in-process LRU + database tier)
+LLM_CACHE_ENABLED = True
+LLM_CACHE_TTL = 60 * 60 * 24 * 7  # seconds
+LLM_CACHE_MEMORY_ENTRIES = 256
+LLM_CACHE_DB_ENTRIES = 5000
+
+# Resume PDF extraction limits
+PDF_MAX_PAGES = 20
+PDF_MAX_CHARS = 50000
+PDF_EXTRACT_ISOLATED = False  # parse in a subprocess with a hard timeout
+PDF_EXTRACT_TIMEOUT = 20  # seconds, only used when isolated
+
+# GitHub API client (token is read from GITHUB_TOKEN in the environment)
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_TIMEOUT = (3.05, 10)  # connect, read
+GITHUB_MAX_REPOS = 100
+
+# job matching: refit the TF-IDF vocabulary after this many job saves
+JOB_INDEX_REFIT_AFTER = 50
+
+# minimum percentage to pass a skill test (regrade_skill_attempts re-applies it)
+SKILL_TEST_PASS_MARK = 60
+
+# Skill test question bank
+QUESTION_BANK_LOW_WATER = 20  # refill a category below this many questions
+QUESTION_BANK_REFILL_SIZE = 10  # questions generated per refill job
+
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
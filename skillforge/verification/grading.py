@@ -0,0 +1,44 @@
+import numpy as np
+from django.conf import settings
+
+# padding for ragged rows; never equal to each other or to a real answer
+_NO_KEY = object()
+_NO_ANSWER = object()
+
+
+def pass_mark():
+    return getattr(settings, "SKILL_TEST_PASS_MARK", 60)
+
+
+def _padded(rows, width, fill):
+    grid = np.full((len(rows), width), fill, dtype=object)
+    for i, row in enumerate(rows):
+        row = row[:width]
+        grid[i, :len(row)] = row
+    return grid
+
+
+def grade(answer_keys, answers, totals, mark=None):
+    """
+    Grade many attempts at once.
+
+    `answer_keys` and `answers` are per-attempt lists (ragged), `totals`
+    the question counts. Returns numpy arrays (correct, percentage, passed).
+    """
+    mark = pass_mark() if mark is None else mark
+    width = max((len(keys) for keys in answer_keys), default=0)
+
+    keys = _padded(answer_keys, width, _NO_KEY)
+    given = _padded(answers, width, _NO_ANSWER)
+
+    correct = (keys == given).sum(axis=1).astype(int) if width else np.zeros(len(answer_keys), dtype=int)
+    totals = np.asarray(totals, dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percentage = np.where(totals > 0, correct / totals * 100, 0.0)
+
+    return correct, percentage, percentage >= mark
+
+
+def answer_key(questions):
+    return [question.get("correct_answer", _NO_KEY) for question in questions]
@@ -0,0 +1,175 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.db import DatabaseError, IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import BackgroundJob
+from .utils.llm_limiter import llm_user
+from .utils.llm_metrics import llm_metrics
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(name: str, task: str, user=None, dedupe_key: str = "", **payload):
+    """
+    Queue `task` (dotted path to a callable) to be run by the worker
+    with `payload` as keyword arguments. Returns the BackgroundJob.
+
+    With `dedupe_key`, a job already queued under that key is returned
+    instead of adding another one, so callers share its result.
+    """
+    if dedupe_key:
+        queued = BackgroundJob.objects.filter(dedupe_key=dedupe_key, status="queued").first()
+        if queued:
+            return queued
+
+    try:
+        with transaction.atomic():
+            return BackgroundJob.objects.create(
+                user=user,
+                name=name,
+                task=task,
+                payload=payload,
+                dedupe_key=dedupe_key,
+            )
+
+    except IntegrityError:
+        # lost the race with a concurrent enqueue for the same key
+        if not dedupe_key:
+            raise
+        return BackgroundJob.objects.get(dedupe_key=dedupe_key, status="queued")
+
+
+def _busy_keys():
+    return BackgroundJob.objects.filter(status="running")\
+                                .exclude(dedupe_key="")\
+                                .values("dedupe_key")
+
+
+def claim_next_job():
+    """
+    Atomically move the oldest queued job to "running".
+    The conditional update makes this safe with several workers. Jobs
+    whose dedupe_key is already running wait until that run finishes.
+    """
+    while True:
+        job_id = BackgroundJob.objects.filter(status="queued")\
+                                      .exclude(dedupe_key__in=_busy_keys())\
+                                      .order_by("created_at", "id")\
+                                      .values_list("id", flat=True)\
+                                      .first()
+        if job_id is None:
+            return None
+
+        claimed = BackgroundJob.objects.filter(id=job_id, status="queued")\
+                                       .exclude(dedupe_key__in=_busy_keys())\
+                                       .update(
+            status="running",
+            started_at=timezone.now(),
+            attempts=F("attempts") + 1,
+        )
+
+        if claimed:
+            return BackgroundJob.objects.get(id=job_id)
+
+
+def run_job(job: BackgroundJob):
+    try:
+        func = import_string(job.task)
+        # LLM calls made by the task count against the job owner's limit
+        with llm_user(job.user_id):
+            func(**job.payload)
+
+    except Exception as e:
+        logger.exception("Background job %s failed", job.id)
+        job.status = "failed"
+        job.error = str(e)
+
+    else:
+        job.status = "done"
+        job.error = ""
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "finished_at"])
+    # the metrics endpoint is served by the web processes
+    llm_metrics.flush(force=True)
+
+    return job
+
+
+def requeue_stale_jobs(older_than: timedelta):
+    """Put back jobs whose worker died mid-run."""
+    cutoff = timezone.now() - older_than
+    stale = BackgroundJob.objects.filter(status="running", started_at__lt=cutoff)
+
+    # a newer job with the same key is already waiting and will redo the work
+    stale.filter(
+        dedupe_key__in=BackgroundJob.objects.filter(status="queued")
+                                            .exclude(dedupe_key="")
+                                            .values("dedupe_key")
+    ).update(
+        status="failed",
+        error="Superseded by a newer queued job",
+        finished_at=timezone.now()
+    )
+
+    return stale.update(status="queued", started_at=None)
+
+
+def run_worker(poll_interval: float = 1.0, burst: bool = False, max_backoff: float = 30.0):
+    """
+    Process jobs until stopped. With `burst` the loop exits as soon
+    as the queue is empty. Database errors (a locked SQLite file, a
+    dropped connection) are logged and retried with backoff.
+    """
+    processed = 0
+    backoff = 1.0
+    unsaved = None  # finished job whose result couldn't be written
+
+    while True:
+        # drop connections the server closed or that errored last round
+        close_old_connections()
+        job = None
+
+        try:
+            if unsaved is not None:
+                unsaved.save(update_fields=["status", "error", "finished_at"])
+                unsaved = None
+                processed += 1
+
+            job = claim_next_job()
+
+            if job is None:
+                if burst:
+                    return processed
+                time.sleep(poll_interval)
+                continue
+
+            run_job(job)
+
+        except DatabaseError:
+            logger.exception("Worker database error, retrying in %ss", backoff)
+            if job is not None and job.finished_at is not None:
+                unsaved = job
+            time.sleep(backoff)
+            backoff = min(backoff * 2, max_backoff)
+            continue
+
+        backoff = 1.0
+        processed += 1
+
+
+def get_job_status(job: BackgroundJob):
+    return {
+        "job_id": job.id,
+        "name": job.name,
+        "status": job.status,
+        "error": job.error or None,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
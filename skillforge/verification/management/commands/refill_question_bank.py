@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from verification.models import SkillCategory
+from verification.services import refill_question_bank, schedule_bank_refill
+
+
+class Command(BaseCommand):
+    help = "Top up the skill test question bank for categories below the low-water mark"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--category",
+            help="Only this category name",
+        )
+        parser.add_argument(
+            "--now",
+            action="store_true",
+            help="Generate inline instead of queueing jobs for the worker",
+        )
+
+    def handle(self, *args, **options):
+        categories = SkillCategory.objects.all()
+        if options["category"]:
+            categories = categories.filter(name__iexact=options["category"])
+
+        for category in categories:
+            if options["now"]:
+                added = refill_question_bank(category.id)
+                self.stdout.write(f"{category.name}: added {added} question(s)")
+                continue
+
+            job = schedule_bank_refill(category)
+            if job:
+                self.stdout.write(f"{category.name}: queued refill job #{job.id}")
@@ -0,0 +1,201 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import StudentReport
+from verification.grading import answer_key, grade, pass_mark
+from verification.models import BankQuestion, SkillTestAttempt
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-score evaluated skill test attempts (after fixing answer keys or "
+        "changing SKILL_TEST_PASS_MARK) and refresh StudentReport scores"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Rows fetched from the database cursor at a time",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Attempts graded and written per transaction",
+        )
+        parser.add_argument(
+            "--start-after",
+            type=int,
+            help="Skip attempts with an id up to this one (overrides the checkpoint)",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="File holding the last finished attempt id; read on start, written per batch",
+        )
+        parser.add_argument(
+            "--pass-mark",
+            type=float,
+            help="Percentage needed to pass (default: SKILL_TEST_PASS_MARK)",
+        )
+        parser.add_argument(
+            "--sync-bank-answers",
+            action="store_true",
+            help="Take correct answers from the question bank where the question text matches",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Count changes without writing anything",
+        )
+
+    def handle(self, *args, **options):
+        self.mark = options["pass_mark"] if options["pass_mark"] is not None else pass_mark()
+        self.sync_bank = options["sync_bank_answers"]
+        self.dry_run = options["dry_run"]
+        self.checkpoint = options["checkpoint"]
+        self.bank_answers = {}
+
+        start_after = options["start_after"]
+        if start_after is None:
+            start_after = self.read_checkpoint()
+
+        attempts = SkillTestAttempt.objects.filter(is_evaluated=True, id__gt=start_after)\
+                                           .order_by("id")\
+                                           .only(
+                                               "id", "user_id", "category_id",
+                                               "generated_questions", "submitted_answers",
+                                               "total_questions", "score", "percentage", "passed",
+                                           )
+
+        batch = []
+        seen = changed = 0
+
+        for attempt in attempts.iterator(chunk_size=options["chunk_size"]):
+            batch.append(attempt)
+
+            if len(batch) >= options["batch_size"]:
+                changed += self.process(batch)
+                seen += len(batch)
+                self.stdout.write(f"Regraded {seen} attempt(s), {changed} changed, last id {batch[-1].id}")
+                batch = []
+
+        if batch:
+            changed += self.process(batch)
+            seen += len(batch)
+
+        verb = "would change" if self.dry_run else "changed"
+        self.stdout.write(self.style.SUCCESS(f"Done: {seen} attempt(s) regraded, {changed} {verb}"))
+
+    def read_checkpoint(self):
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return 0
+
+        with open(self.checkpoint) as f:
+            value = f.read().strip()
+
+        try:
+            return int(value or 0)
+        except ValueError:
+            raise CommandError(f"Checkpoint {self.checkpoint} does not hold an attempt id")
+
+    def write_checkpoint(self, last_id):
+        if not self.checkpoint or self.dry_run:
+            return
+
+        tmp = f"{self.checkpoint}.tmp"
+        with open(tmp, "w") as f:
+            f.write(str(last_id))
+        os.replace(tmp, self.checkpoint)
+
+    def corrected_questions(self, attempt):
+        """Questions with answer keys taken from the bank; None if nothing changed."""
+        answers = self.bank_answers.get(attempt.category_id)
+        if answers is None:
+            answers = dict(
+                BankQuestion.objects.filter(category_id=attempt.category_id)
+                                    .values_list("question", "correct_answer")
+            )
+            self.bank_answers[attempt.category_id] = answers
+
+        updated = False
+        questions = []
+        for question in attempt.generated_questions:
+            fixed = answers.get(question.get("question"))
+            if fixed is not None and fixed != question.get("correct_answer"):
+                question = {**question, "correct_answer": fixed}
+                updated = True
+            questions.append(question)
+
+        return questions if updated else None
+
+    def process(self, batch):
+        fields = ["score", "percentage", "passed"]
+
+        if self.sync_bank:
+            for attempt in batch:
+                questions = self.corrected_questions(attempt)
+                if questions is not None:
+                    attempt.generated_questions = questions
+                    attempt._questions_fixed = True
+            fields.append("generated_questions")
+
+        correct, percentage, passed = grade(
+            [answer_key(attempt.generated_questions) for attempt in batch],
+            [attempt.submitted_answers or [] for attempt in batch],
+            [attempt.total_questions for attempt in batch],
+            self.mark
+        )
+
+        updated = []
+        for attempt, score, pct, ok in zip(batch, correct, percentage, passed):
+            score, pct, ok = int(score), float(pct), bool(ok)
+
+            if (score, pct, ok) == (attempt.score, attempt.percentage, attempt.passed) \
+                    and not getattr(attempt, "_questions_fixed", False):
+                continue
+
+            attempt.score, attempt.percentage, attempt.passed = score, pct, ok
+            updated.append(attempt)
+
+        if self.dry_run:
+            return len(updated)
+
+        with transaction.atomic():
+            SkillTestAttempt.objects.bulk_update(updated, fields)
+            self.update_reports({attempt.user_id for attempt in updated})
+
+        self.write_checkpoint(batch[-1].id)
+
+        return len(updated)
+
+    def update_reports(self, user_ids):
+        """Point each report at the student's latest evaluated attempt again."""
+        if not user_ids:
+            return
+
+        latest = {}
+        rows = SkillTestAttempt.objects.filter(user_id__in=user_ids, is_evaluated=True)\
+                                       .order_by("user_id", "-completed_at", "-id")\
+                                       .values_list("user_id", "percentage", "passed")
+        for user_id, pct, ok in rows:
+            latest.setdefault(user_id, (pct, ok))
+
+        reports = StudentReport.objects.filter(student__user_id__in=latest)\
+                                       .only("id", "skill_test_score", "report_summary", "generated_at", "student__user_id")\
+                                       .select_related("student")
+
+        # bulk_update skips auto_now; generated_at is the report's ETag version
+        now = timezone.now()
+        for report in reports:
+            report.generated_at = now
+            pct, ok = latest[report.student.user_id]
+            report.skill_test_score = pct
+            if report.report_summary.get("stage") in ("verified", "needs_improvement"):
+                report.report_summary["stage"] = "verified" if ok else "needs_improvement"
+
+        StudentReport.objects.bulk_update(reports, ["skill_test_score", "report_summary", "generated_at"])
@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from verification.jobs import requeue_stale_jobs, run_worker
+
+
+class Command(BaseCommand):
+    help = "Run the background job worker (report generation etc.)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the queue is empty",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue is empty",
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=600,
+            help="Requeue jobs stuck in 'running' for this many seconds",
+        )
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_jobs(timedelta(seconds=options["stale_after"]))
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale job(s)")
+
+        self.stdout.write("Worker started")
+
+        processed = run_worker(
+            poll_interval=options["poll_interval"],
+            burst=options["burst"],
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} job(s)"))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('verification', '0004_llmcacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('difficulty', models.CharField(choices=[('Easy', 'Easy'), ('Medium', 'Medium'), ('Hard', 'Hard')], max_length=10)),
+                ('question', models.TextField()),
+                ('options', models.JSONField(default=list)),
+                ('question_type', models.CharField(blank=True, max_length=20)),
+                ('correct_answer', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bank_questions', to='verification.skillcategory')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['category', 'difficulty'], name='verificatio_categor_147269_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('verification', '0005_bankquestion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.IntegerField(unique=True)),
+                ('holder', models.CharField(blank=True, max_length=64)),
+                ('user_id', models.IntegerField(blank=True, db_index=True, null=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
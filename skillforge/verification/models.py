@@ -77,6 +77,49 @@ class SkillCategory(models.Model):
         return self.name
 
 
+class BankQuestion(models.Model):
+    DIFFICULTY_CHOICES = (
+        ("Easy", "Easy"),
+        ("Medium", "Medium"),
+        ("Hard", "Hard"),
+    )
+
+    QUESTION_TYPES = ("theory", "practical", "task")
+
+    category = models.ForeignKey(
+        SkillCategory,
+        on_delete=models.CASCADE,
+        related_name="bank_questions"
+    )
+
+    difficulty = models.CharField(max_length=10, choices=DIFFICULTY_CHOICES)
+
+    question = models.TextField()
+    options = models.JSONField(default=list)
+    question_type = models.CharField(max_length=20, blank=True)
+    correct_answer = models.CharField(max_length=255)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["category", "difficulty"]),
+        ]
+
+    def as_question(self):
+        # same shape as the questions returned by generate_test
+        return {
+            "question": self.question,
+            "options": self.options,
+            "type": self.question_type,
+            "difficulty": self.difficulty,
+            "correct_answer": self.correct_answer,
+        }
+
+    def __str__(self):
+        return f"{self.category.name} ({self.difficulty}) - {self.question[:50]}"
+
+
 class SkillTestAttempt(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -113,3 +156,96 @@ class SkillTestAttempt(models.Model):
 
     def __str__(self):
         return f"{self.user.email} - {self.category.name}"
+
+
+class BackgroundJob(models.Model):
+    STATUS_CHOICES = (
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="background_jobs"
+    )
+
+    # short label shown to clients, e.g. "partial_report"
+    name = models.CharField(max_length=100)
+    # dotted path of the callable the worker runs
+    task = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict, blank=True)
+    # jobs sharing a key are coalesced while queued and never run at once
+    dedupe_key = models.CharField(max_length=255, blank=True, db_index=True)
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default="queued"
+    )
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dedupe_key"],
+                condition=models.Q(status="queued") & ~models.Q(dedupe_key=""),
+                name="unique_queued_dedupe_key",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} - {self.status}"
+
+
+class LLMCacheEntry(models.Model):
+    # sha256 of (model name, template, rendered inputs)
+    key = models.CharField(max_length=64, unique=True)
+
+    prompt_name = models.CharField(max_length=100)
+    model_name = models.CharField(max_length=100)
+
+    response = models.JSONField()
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.prompt_name} - {self.key[:12]}"
+
+
+class LLMSlot(models.Model):
+    """One of LLM_MAX_CONCURRENCY slots; a held slot is an in-flight LLM call."""
+    slot = models.IntegerField(unique=True)
+
+    holder = models.CharField(max_length=64, blank=True)
+    user_id = models.IntegerField(null=True, blank=True, db_index=True)
+    # a crashed holder's slot frees itself after this
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"slot {self.slot} - {self.holder or 'free'}"
+
+
+class LLMMetricsSnapshot(models.Model):
+    """The latest LLM metrics snapshot of one web or worker process."""
+    process = models.CharField(max_length=100, unique=True)
+
+    data = models.JSONField(default=dict)
+
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.process} - {self.updated_at}"
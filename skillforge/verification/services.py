@@ -1,18 +1,150 @@
+import contextvars
+import json
 import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.db.models import Count
 
 from accounts.models import *
 from .models import *
 from proctor.models import Exam, ExamSession
-from .utils.pdf_utils import extract_text_from_pdf_fileobj
+from .utils.pdf_utils import (
+    read_file_bytes,
+    sha256_bytes,
+    extract_resume_text,
+)
 from .utils.git_utils import fetch_github_profile
+from .utils.prompt_budget import compact_github_profile
 from .utils.langchain_utils import *
+from .jobs import enqueue
+from .grading import answer_key, grade
+from .skill_taxonomy import primary_skill
+from .utils.llm_limiter import llm_user
+from django.conf import settings
 from django.utils import timezone
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+def _in_thread(func, *args):
+    # worker threads get their own DB connection; close it when done
+    try:
+        return func(*args)
+    finally:
+        connections.close_all()
+
+
+def get_resume_text(profile: StudentProfile, data: bytes | None = None):
+    """
+    Extracted resume text, parsed only when the file content changed.
+    Extraction errors propagate and nothing is stored, so the next call
+    retries.
+    """
+    if not profile.resume:
+        return ""
+
+    if data is None:
+        data = read_file_bytes(profile.resume)
+    digest = sha256_bytes(data)
+
+    if digest == profile.resume_sha256:
+        return profile.resume_text
+
+    text = extract_resume_text(data)
+
+    profile.resume_sha256 = digest
+    profile.resume_text = text
+    profile.save(update_fields=["resume_sha256", "resume_text"])
+
+    return text
+
+
+def report_input_values(profile: StudentProfile):
+    """The profile fields that feed the partial report, for comparison."""
+    return {
+        "resume": profile.resume.name if profile.resume else "",
+        "github_url": profile.github_url or "",
+    }
+
+
+def report_inputs_changed(profile: StudentProfile, before: dict):
+    """
+    Whether an edit can change the partial report: `before` is the
+    report_input_values() snapshot from before the save. A missing or
+    failed report always needs a run.
+    """
+    if report_input_values(profile) != before:
+        return True
+
+    report = StudentReport.objects.filter(student=profile).first()
+    if report is None:
+        return True
+
+    summary = report.report_summary or {}
+    return "error" in summary or "summary" not in summary
+
+
+def _fingerprint(*parts):
+    return sha256_bytes(
+        json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    )
+
+
+def _resume_analysis(profile: StudentProfile, previous: tuple):
+    """Returns (analysis, fingerprint); reuses `previous` when unchanged."""
+    if not profile.resume:
+        return {}, ""
+
+    data = read_file_bytes(profile.resume)
+    fingerprint = sha256_bytes(data)
+
+    previous_fingerprint, previous_analysis = previous
+    if fingerprint == previous_fingerprint and previous_analysis:
+        return previous_analysis, fingerprint
+
+    try:
+        text = get_resume_text(profile, data)
+    except Exception as e:
+        # no fingerprint: don't remember failures, the next run should retry
+        return analyze_resume(f"Error extracting text: {str(e)}"), ""
+
+    return analyze_resume(text), fingerprint
+
+
+def _github_analysis(profile: StudentProfile, previous: tuple):
+    """
+    Returns (analysis, fingerprint, repo language counts); reuses
+    `previous` when unchanged.
+    """
+    if not profile.github_url:
+        return {}, "", {}
+
+    username = profile.github_url.rstrip("/").split("/")[-1]
+    github_data = fetch_github_profile(username)
+    fingerprint = f"{username}:{_fingerprint(github_data)}"
+    languages = dict(Counter(
+        repo["language"] for repo in github_data.get("repos", []) if repo.get("language")
+    ))
+
+    previous_fingerprint, previous_analysis = previous
+    if fingerprint == previous_fingerprint and previous_analysis:
+        return previous_analysis, fingerprint, languages
+
+    compact = compact_github_profile(
+        github_data,
+        max_repos=getattr(settings, "LLM_GITHUB_PROMPT_REPOS", 30),
+        max_tokens=getattr(settings, "LLM_GITHUB_TOKEN_BUDGET", 3000)
+    )
+    return analyze_github_profile(compact), fingerprint, languages
+
+
 def generate_partial_report(student_id: int):
-  
+    """
+    Builds the temporary report. Each sub-analysis records a fingerprint
+    of its inputs in `input_fingerprints`; parts whose inputs didn't
+    change are reused from the previous `report_summary`.
+    """
 
     try:
         user = User.objects.get(id=student_id)
@@ -20,54 +152,248 @@ def generate_partial_report(student_id: int):
 
         report, _ = StudentReport.objects.get_or_create(student=profile)
 
-   
-        resume_analysis = {}
-
-        if profile.resume:
-            text = extract_text_from_pdf_fileobj(profile.resume)
-            resume_analysis = analyze_resume(text)
+        previous = report.report_summary or {}
+        if "error" in previous:
+            previous = {}
+        fingerprints = report.input_fingerprints or {}
+
+        # resume and GitHub analyses are independent, run them side by side
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            # copy_context: keep the llm_user attribution in the threads
+            resume_future = pool.submit(
+                contextvars.copy_context().run,
+                _in_thread,
+                _resume_analysis,
+                profile,
+                (fingerprints.get("resume"), previous.get("resume_analysis"))
+            )
+            github_future = pool.submit(
+                contextvars.copy_context().run,
+                _in_thread,
+                _github_analysis,
+                profile,
+                (fingerprints.get("github"), previous.get("github_analysis"))
+            )
 
-        github_analysis = {}
+            resume_analysis, resume_fingerprint = resume_future.result()
+            github_analysis, github_fingerprint, github_languages = github_future.result()
 
-        if profile.github_url:
-            username = profile.github_url.rstrip("/").split("/")[-1]
-            github_data = fetch_github_profile(username)
-            github_analysis = analyze_github_profile(str(github_data))
+        summary_fingerprint = _fingerprint(resume_fingerprint, github_fingerprint)
 
-        summary = generate_final_report(
-            resume_analysis,
-            github_analysis
-        )
+        if summary_fingerprint == fingerprints.get("summary") and previous.get("summary"):
+            summary = previous["summary"]
+        else:
+            summary = generate_final_report(
+                resume_analysis,
+                github_analysis
+            )
 
-      
-        report.report_summary = {
-            "stage": "temporary",
-            "resume_analysis": resume_analysis,
-            "github_analysis": github_analysis,
-            "summary": summary,
+        fingerprints = {
+            "resume": resume_fingerprint,
+            "github": github_fingerprint,
+            "summary": summary_fingerprint,
         }
 
-        report.save()
+        # the analyses took a while: the student may have taken a test or
+        # the quiz meanwhile, so re-read and write only the report parts
+        with transaction.atomic():
+            report = StudentReport.objects.select_for_update().get(id=report.id)
+            current = report.report_summary or {}
+
+            if fingerprints == report.input_fingerprints and "summary" in current \
+                    and "error" not in current:
+                # same inputs: keep the stage and final analysis
+                return report
+
+            report.report_summary = {
+                "stage": "temporary",
+                "resume_analysis": resume_analysis,
+                "github_analysis": github_analysis,
+                # feeds skill detection for the test category
+                "github_languages": github_languages,
+                "summary": summary,
+            }
+            # the final analysis was dropped with the old summary
+            report.star_rating = None
+            report.recommended_tag = ""
+            report.input_fingerprints = fingerprints
+
+            report.save(update_fields=[
+                "report_summary", "input_fingerprints",
+                "star_rating", "recommended_tag", "generated_at",
+            ])
 
         return report
 
     except Exception:
         logger.exception("Partial report generation failed")
 
-        StudentReport.objects.update_or_create(
-            student_id=student_id,
-            defaults={
-                "report_summary": {
-                    "error": "AI analysis failed. Please retry."
-                }
-            }
+        # update only the report parts, the scores may be newer than this run
+        StudentReport.objects.filter(student__user_id=student_id).update(
+            report_summary={"error": "AI analysis failed. Please retry."},
+            star_rating=None,
+            recommended_tag="",
+            generated_at=timezone.now()
         )
 
         return None
 
 
+def run_partial_report(student_id: int):
+    # worker entry point: surface failures so the job is marked "failed"
+    report = generate_partial_report(student_id)
+
+    if report is None:
+        raise RuntimeError("Partial report generation failed")
+
+
+def enqueue_partial_report(user):
+    """
+    Queue a report run for `user`, or join the one already waiting.
+    Runs for one student never overlap (see jobs.claim_next_job), and a
+    run after an unchanged-input run reuses its analyses.
+
+    The report row is created up front, so report endpoints answer
+    "not ready" rather than failing until the worker gets to the job.
+    """
+    StudentReport.objects.get_or_create(
+        student=user.student_profile,
+        defaults={"report_summary": {"stage": "temporary", "partial_status": "pending"}}
+    )
+
+    return enqueue(
+        "partial_report",
+        "verification.services.run_partial_report",
+        user=user,
+        dedupe_key=f"partial_report:{user.id}",
+        student_id=user.id
+    )
+
+
 
-def generate_skill_test_for_student(student_id: int, category_id: int | None = None):
+SKILL_TEST_QUESTIONS = 5
+
+
+def difficulty_quota(count: int):
+    """{difficulty: n} spreading `count` questions evenly, Medium first."""
+    difficulties = [d for d, _ in BankQuestion.DIFFICULTY_CHOICES]
+    quota = dict.fromkeys(difficulties, count // len(difficulties))
+    for difficulty in ["Medium", "Easy", "Hard"][:count % len(difficulties)]:
+        quota[difficulty] += 1
+    return quota
+
+
+def sample_bank_questions(category: SkillCategory, count: int):
+    """
+    Random questions for `category` from the bank, a fixed share per
+    difficulty (see difficulty_quota). A difficulty the bank is short of
+    is topped up from the others. Ordered Easy to Hard.
+    """
+    bank = BankQuestion.objects.filter(category=category)
+
+    picked = []
+    for difficulty, n in difficulty_quota(count).items():
+        picked += bank.filter(difficulty=difficulty).order_by("?")[:n]
+
+    if len(picked) < count:
+        picked += bank.exclude(id__in=[q.id for q in picked])\
+                      .order_by("?")[:count - len(picked)]
+
+    order = {d: i for i, (d, _) in enumerate(BankQuestion.DIFFICULTY_CHOICES)}
+    picked.sort(key=lambda q: order.get(q.difficulty, len(order)))
+
+    return [q.as_question() for q in picked]
+
+
+def schedule_bank_refill(category: SkillCategory):
+    """
+    Queue a refill when any difficulty of the category is below its share
+    of the low-water mark. The refill asks for the scarcest difficulty.
+    """
+    low_water = getattr(settings, "QUESTION_BANK_LOW_WATER", 20)
+    difficulties = [d for d, _ in BankQuestion.DIFFICULTY_CHOICES]
+
+    stock = dict.fromkeys(difficulties, 0)
+    stock.update(
+        BankQuestion.objects.filter(category=category)
+                            .values_list("difficulty")
+                            .annotate(n=Count("id"))
+    )
+
+    scarcest = min(difficulties, key=lambda d: stock[d])
+    if stock[scarcest] >= low_water / len(difficulties):
+        return None
+
+    pending = BackgroundJob.objects.filter(
+        name="question_bank_refill",
+        status__in=["queued", "running"],
+        payload__category_id=category.id
+    )
+    if pending.exists():
+        return None
+
+    return enqueue(
+        "question_bank_refill",
+        "verification.services.refill_question_bank",
+        category_id=category.id,
+        difficulty=scarcest
+    )
+
+
+def refill_question_bank(category_id: int, num_questions: int | None = None, difficulty: str | None = None):
+    """
+    Generate generic questions for a category and add them to the bank,
+    all of `difficulty` when given.
+    """
+    category = SkillCategory.objects.get(id=category_id)
+    num_questions = num_questions or getattr(settings, "QUESTION_BANK_REFILL_SIZE", 10)
+
+    payload = generate_test(
+        resume_analysis="",
+        github_analysis="",
+        skills=category.name,
+        recommendation=f"Make every question {difficulty} difficulty." if difficulty else "",
+        num_questions=num_questions,
+        role_hint=category.name
+    )
+
+    difficulties = dict(BankQuestion.DIFFICULTY_CHOICES)
+    questions = []
+
+    for q in payload.get("questions", []):
+        if not q.get("question") or not q.get("options") or not q.get("correct_answer"):
+            continue
+
+        level = str(q.get("difficulty", "")).title()
+        # models sometimes echo the "theory/practical/task" placeholder
+        question_type = str(q.get("type", "")).strip().lower()
+
+        questions.append(BankQuestion(
+            category=category,
+            difficulty=level if level in difficulties else difficulty or "Medium",
+            question=q["question"],
+            options=q["options"],
+            question_type=question_type if question_type in BankQuestion.QUESTION_TYPES else "",
+            correct_answer=q["correct_answer"],
+        ))
+
+    BankQuestion.objects.bulk_create(questions)
+
+    return len(questions)
+
+
+def generate_skill_test_for_student(student_id: int, category_id: int | None = None, personalised: bool = False):
+
+    for event, value in stream_skill_test_for_student(student_id, category_id, personalised):
+        if event == "attempt":
+            return value
+
+
+def stream_skill_test_for_student(student_id: int, category_id: int | None = None, personalised: bool = False):
+    """
+    Yields ("token", text) while the LLM writes a personalised test and
+    finally ("attempt", SkillTestAttempt) once it is saved.
+    """
 
     try:
         user = User.objects.get(id=student_id)
@@ -80,39 +406,45 @@ def generate_skill_test_for_student(student_id: int, category_id: int | None = N
             category = SkillCategory.objects.get(id=category_id)
 
         else:
-            resume_data = summary.get("resume_analysis", {})
-            github_data = summary.get("github_analysis", {})
-
-            skills = []
-
-            if isinstance(resume_data, dict):
-                skills += resume_data.get("skills", [])
-
-            if isinstance(github_data, dict):
-                skills += github_data.get("skills", [])
-
-            if not skills:
-                skills = ["Python"]
-
-            primary_skill = skills[0]
-
-            category, _ = SkillCategory.objects.get_or_create(
-                name=primary_skill.title()
+            profile = user.student_profile
+            skill = primary_skill(
+                profile.skills,
+                profile.resume_text,
+                summary.get("github_languages")
             )
 
-        payload = generate_test(
-            resume_analysis=str(summary.get("resume_analysis", "")),
-            github_analysis=str(summary.get("github_analysis", "")),
-            recommendation=str(summary.get("summary", "")),
-            num_questions=5,
-            role_hint=category.name
-        )
+            category = SkillCategory.objects.filter(name__iexact=skill).first()
+            if category is None:
+                category, _ = SkillCategory.objects.get_or_create(name=skill)
+
+        questions = []
+
+        if not personalised:
+            questions = sample_bank_questions(category, SKILL_TEST_QUESTIONS)
+            schedule_bank_refill(category)
+
+        # personalised mode, or the bank can't cover this category yet
+        if len(questions) < SKILL_TEST_QUESTIONS:
+            stream = generate_test(
+                resume_analysis=str(summary.get("resume_analysis", "")),
+                github_analysis=str(summary.get("github_analysis", "")),
+                recommendation=str(summary.get("summary", "")),
+                num_questions=SKILL_TEST_QUESTIONS,
+                role_hint=category.name,
+                stream=True
+            )
+            with llm_user(user.id):
+                for event, value in stream:
+                    if event == "token":
+                        yield "token", value
+                    else:
+                        questions = value["questions"]
 
         attempt = SkillTestAttempt.objects.create(
             user=user,
             category=category,
-            generated_questions=payload["questions"],
-            total_questions=len(payload["questions"]),
+            generated_questions=questions,
+            total_questions=len(questions),
         )
 
         # Create Proctor Session
@@ -125,7 +457,7 @@ def generate_skill_test_for_student(student_id: int, category_id: int | None = N
         attempt.proctor_session = session
         attempt.save()
 
-        return attempt
+        yield "attempt", attempt
 
     except Exception:
         logger.exception("Skill test generation failed")
@@ -155,15 +487,14 @@ def submit_skill_test(student_id: int, attempt_id: int, answers: list):
                 "message": "Test disqualified due to suspicious activity"
             }
 
-        correct = 0
-
-        for i, question in enumerate(attempt.generated_questions):
-            if i < len(answers) and answers[i] == question["correct_answer"]:
-                correct += 1
-
-        total = attempt.total_questions
-        percentage = (correct / total) * 100 if total else 0
-        passed = percentage >= 60
+        correct, percentage, passed = grade(
+            [answer_key(attempt.generated_questions)],
+            [answers],
+            [attempt.total_questions]
+        )
+        correct = int(correct[0])
+        percentage = float(percentage[0])
+        passed = bool(passed[0])
 
         attempt.submitted_answers = answers
         attempt.score = correct
@@ -172,27 +503,33 @@ def submit_skill_test(student_id: int, attempt_id: int, answers: list):
         attempt.completed_at = timezone.now()
         attempt.is_evaluated = True
         attempt.save()
-        final_report = final_analysis(
-            str(report.report_summary.get("resume_analysis", "")),
-            str(report.report_summary.get("github_analysis", "")),
-            str(report.report_summary.get("summary", "")),
-            percentage,
-            "PASS" if passed else "FAIL"
-        )
 
         report.skill_test_score = percentage
 
-        report.report_summary["final"] = final_report
+        # the structured analysis is produced by the worker
+        report.report_summary.pop("final", None)
+        report.star_rating = None
+        report.recommended_tag = ""
+        report.report_summary["final_status"] = "pending"
         report.report_summary["stage"] = "verified" if passed else "needs_improvement"
 
         report.save()
 
+        job = enqueue(
+            "final_analysis",
+            "verification.services.run_final_analysis",
+            user=user,
+            dedupe_key=f"final_analysis:{user.id}",
+            attempt_id=attempt.id
+        )
+
         return {
             "status": "completed",
             "score": correct,
             "percentage": percentage,
             "passed": passed,
-            "analysis": final_report
+            "analysis_status": "pending",
+            "analysis_job_id": job.id
         }
 
     except Exception:
@@ -202,6 +539,56 @@ def submit_skill_test(student_id: int, attempt_id: int, answers: list):
 
 
 
+def latest_evaluated_attempt(user_id: int):
+    return SkillTestAttempt.objects.filter(user_id=user_id, is_evaluated=True)\
+                                   .order_by("-completed_at", "-id")\
+                                   .first()
+
+
+def run_final_analysis(attempt_id: int):
+    """
+    Worker task: final structured analysis for the student's latest
+    evaluated attempt. A retake submitted while this job was queued
+    joins it (same dedupe key), so `attempt_id` may be an older one.
+    """
+    attempt = SkillTestAttempt.objects.select_related("user").get(id=attempt_id)
+    latest = latest_evaluated_attempt(attempt.user_id)
+    if latest.id != attempt.id:
+        attempt = latest
+
+    report = StudentReport.objects.get(student__user=attempt.user)
+
+    try:
+        final_report = final_analysis(
+            str(report.report_summary.get("resume_analysis", "")),
+            str(report.report_summary.get("github_analysis", "")),
+            str(report.report_summary.get("summary", "")),
+            attempt.percentage,
+            "PASS" if attempt.passed else "FAIL"
+        )
+
+    except Exception:
+        if latest_evaluated_attempt(attempt.user_id).id != attempt.id:
+            return None
+        report.refresh_from_db()
+        report.report_summary["final_status"] = "failed"
+        report.save()
+        raise
+
+    # retaken meanwhile: the retake's own job writes the report
+    if latest_evaluated_attempt(attempt.user_id).id != attempt.id:
+        return None
+
+    # re-read so concurrent changes to the report aren't overwritten
+    report.refresh_from_db()
+    report.report_summary["final"] = final_report
+    report.report_summary["final_status"] = "ready"
+    report.star_rating = final_report["star_rating"]
+    report.recommended_tag = next(iter(final_report["recommended_tags"]), "")
+    report.save()
+
+    return report
+
 
 def get_final_analysis(student_id: int):
   
@@ -222,6 +609,7 @@ def get_final_analysis(student_id: int):
 
         "partial_summary": summary.get("summary"),
         "final_analysis": summary.get("final"),
+        "final_status": summary.get("final_status"),
     }
 
 
@@ -261,25 +649,24 @@ def submit_personality_assessment(user, answers):
         "score": total,
         "learning_level": level
     }
-import json
-import re
-
-
 def get_recommendation(student_id: int):
 
-    report = StudentReport.objects.get(
+    report = StudentReport.objects.filter(
         student__user_id=student_id
-    )
+    ).first()
+
+    if report is None:
+        return {"status": "not_ready", "analysis_status": None}
 
     summary = report.report_summary or {}
     final_data = summary.get("final")
 
-    if not final_data:
-        return {"status": "not_ready"}
-
-    if isinstance(final_data, str):
-        cleaned = re.sub(r"```json|```", "", final_data).strip()
-        final_data = json.loads(cleaned)
+    # legacy rows the 0004 migration couldn't parse keep raw text
+    if not final_data or not isinstance(final_data, dict):
+        return {
+            "status": "not_ready",
+            "analysis_status": summary.get("final_status")
+        }
 
     return {
         "status": "ready",
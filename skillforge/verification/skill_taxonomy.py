@@ -0,0 +1,198 @@
+"""
+Local skill detection for picking skill test categories.
+
+Skills are matched against a synonym taxonomy with an Aho-Corasick
+automaton built once per process, so extraction is a single pass over
+the text and needs no LLM call.
+"""
+from collections import Counter, deque
+
+# canonical name -> synonyms (lowercase); the canonical name is matched too
+TAXONOMY = {
+    "Python": ["python3", "python 3", "py"],
+    "Django": ["django rest framework", "drf"],
+    "Flask": [],
+    "FastAPI": ["fast api"],
+    "JavaScript": ["js", "ecmascript", "es6", "vanilla js"],
+    "TypeScript": ["ts"],
+    "React": ["react.js", "reactjs", "react js", "react native"],
+    "Angular": ["angularjs", "angular.js"],
+    "Vue": ["vue.js", "vuejs", "nuxt"],
+    "Node.js": ["node", "nodejs", "node js", "express", "express.js"],
+    "Next.js": ["nextjs"],
+    "HTML": ["html5"],
+    "CSS": ["css3", "sass", "scss", "tailwind", "tailwindcss", "bootstrap"],
+    "Java": ["jdk", "spring", "spring boot", "springboot"],
+    "Kotlin": [],
+    "C": ["ansi c", "c language", "c programming"],
+    "C++": ["cpp", "c plus plus"],
+    "C#": ["csharp", "c sharp", ".net", "dotnet", "asp.net"],
+    "Go": ["golang"],
+    "Rust": [],
+    "Ruby": ["ruby on rails", "rails"],
+    "PHP": ["laravel", "symfony"],
+    "Swift": ["swiftui"],
+    "Dart": ["flutter"],
+    "R": ["r programming", "rstudio"],
+    "SQL": ["mysql", "postgresql", "postgres", "sqlite", "pl/sql", "t-sql"],
+    "MongoDB": ["mongo", "mongoose"],
+    "Redis": [],
+    "Machine Learning": ["ml", "scikit-learn", "sklearn", "xgboost"],
+    "Deep Learning": ["tensorflow", "pytorch", "keras", "neural networks"],
+    "Data Science": ["pandas", "numpy", "data analysis", "matplotlib", "jupyter", "jupyter notebook"],
+    "Docker": ["containers", "docker compose"],
+    "Kubernetes": ["k8s", "helm"],
+    "AWS": ["amazon web services", "ec2", "s3", "lambda"],
+    "Linux": ["bash", "shell", "shell scripting", "unix"],
+    "Git": ["github", "gitlab"],
+}
+
+# short or common-word synonyms only trusted in explicit skill lists,
+# never in free text ("c", "r", "go", "ts", "py", "shell", ...)
+LIST_ONLY = {
+    "c", "r", "go", "ts", "py", "js", "ml", "node", "express", "spring",
+    "rails", "shell", "containers", "lambda", "s3", "mongo", "drf", "swift",
+    "rust", "dart", "git", "helm",
+}
+
+# evidence weights per source
+PROFILE_WEIGHT = 3.0
+GITHUB_WEIGHT = 2.0
+RESUME_WEIGHT = 1.0
+
+DEFAULT_SKILL = "Python"
+
+
+def _synonyms():
+    for canonical, synonyms in TAXONOMY.items():
+        yield canonical.lower(), canonical
+        for synonym in synonyms:
+            yield synonym, canonical
+
+
+SYNONYMS = dict(_synonyms())
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over lowercase synonyms, matching whole words."""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for pattern, skill in patterns.items():
+            self._add(pattern, skill)
+        self._link()
+
+    def _add(self, pattern, skill):
+        state = 0
+        for char in pattern:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        self.output[state].append((len(pattern), skill))
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, text):
+        """Counter of canonical skills found in `text`."""
+        text = text.lower()
+        seen = set()
+        state = 0
+
+        for end, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+
+            for length, skill in self.output[state]:
+                start = end - length + 1
+                if _is_word(text, start, end):
+                    # "react" and "react.js" at one spot are one mention
+                    seen.add((skill, start))
+
+        return Counter(skill for skill, _ in seen)
+
+
+def _is_word(text, start, end):
+    before = text[start - 1] if start > 0 else " "
+    after = text[end + 1] if end + 1 < len(text) else " "
+    # "c" must not match inside "c++" or "c#", nor "java" inside "javascript"
+    return not (before.isalnum() or after.isalnum() or after in "+#")
+
+
+_text_matcher = None
+
+
+def text_matcher():
+    global _text_matcher
+    if _text_matcher is None:
+        _text_matcher = SkillMatcher({
+            synonym: skill for synonym, skill in SYNONYMS.items()
+            if synonym not in LIST_ONLY
+        })
+    return _text_matcher
+
+
+def skills_from_list(value):
+    """Canonical skills from a comma/newline separated list, in order."""
+    skills = []
+    for item in value.replace("\n", ",").replace(";", ",").split(","):
+        item = item.strip().lower()
+        if not item:
+            continue
+
+        found = [SYNONYMS[item]] if item in SYNONYMS else list(text_matcher().find(item))
+        for skill in found:
+            if skill not in skills:
+                skills.append(skill)
+
+    return skills
+
+
+def rank_skills(profile_skills="", resume_text="", github_languages=None):
+    """
+    [(skill, score), ...] best first. Skills the student lists weigh most,
+    then GitHub repo languages (by share of repos), then resume mentions.
+    """
+    scores = Counter()
+
+    listed = skills_from_list(profile_skills or "")
+    for position, skill in enumerate(listed):
+        # earlier entries are usually the student's main skills
+        scores[skill] += PROFILE_WEIGHT * (1 - position / (2 * len(listed)))
+
+    languages = Counter()
+    for language, count in (github_languages or {}).items():
+        skill = SYNONYMS.get(str(language).lower())
+        if skill:
+            languages[skill] += count
+    total = sum(languages.values())
+    for skill, count in languages.items():
+        scores[skill] += GITHUB_WEIGHT * count / total
+
+    for skill, count in text_matcher().find(resume_text or "").items():
+        scores[skill] += RESUME_WEIGHT * min(1 + 0.25 * (count - 1), 2)
+
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+def primary_skill(profile_skills="", resume_text="", github_languages=None):
+    ranked = rank_skills(profile_skills, resume_text, github_languages)
+    return ranked[0][0] if ranked else DEFAULT_SKILL
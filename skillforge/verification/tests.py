@@ -1,3 +1,189 @@
-from django.test import TestCase
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+
+from .grading import answer_key, grade
+from .jobs import claim_next_job, enqueue, run_job
+from .models import BackgroundJob
+from .skill_taxonomy import SkillMatcher, primary_skill, skills_from_list, text_matcher
+from .utils.git_utils import GitHubClient, GitHubError
+
+REPOS = [
+    {
+        "name": f"repo{i}",
+        "description": "",
+        "language": "Python",
+        "stargazers_count": i,
+        "pushed_at": f"2024-01-0{i + 1}T00:00:00Z",
+        "html_url": f"https://github.com/alice/repo{i}",
+    }
+    for i in range(5)
+]
+
+
+class StubGitHub(BaseHTTPRequestHandler):
+    """Just enough of the GitHub API: one user, paginated repos, ETags."""
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, data, etag, links=None):
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        if links:
+            self.send_header("Link", links)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        self.requests.append((url.path, query, self.headers.get("If-None-Match")))
+        base = f"http://{self.headers['Host']}"
+
+        if url.path == "/users/alice":
+            self.reply({
+                "login": "alice",
+                "name": "Alice",
+                "bio": "",
+                "public_repos": len(REPOS),
+                "repos_url": f"{base}/users/alice/repos",
+            }, '"user-v1"')
+
+        elif url.path == "/users/alice/repos":
+            per_page = int(query.get("per_page", ["30"])[0])
+            page = int(query.get("page", ["1"])[0])
+            links = None
+            if page * per_page < len(REPOS):
+                links = f'<{base}/users/alice/repos?per_page={per_page}&page={page + 1}>; rel="next"'
+            self.reply(REPOS[(page - 1) * per_page:page * per_page], f'"repos-{page}"', links)
+
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+
+class GitHubClientTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubGitHub)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        StubGitHub.requests = []
+
+    def github(self, **kwargs):
+        return GitHubClient(base_url=self.base_url, **kwargs)
+
+    def test_repos_follow_pagination_sorted_by_push(self):
+        profile = self.github(per_page=2).fetch_profile("alice")
+
+        self.assertEqual([repo["name"] for repo in profile["repos"]], [r["name"] for r in REPOS])
+        repo_calls = [query for path, query, _ in StubGitHub.requests if path.endswith("/repos")]
+        self.assertEqual(len(repo_calls), 3)
+        self.assertEqual(repo_calls[0]["sort"], ["pushed"])
+
+    def test_max_repos_stops_paging(self):
+        profile = self.github(per_page=2, max_repos=2).fetch_profile("alice")
+
+        self.assertEqual(len(profile["repos"]), 2)
+        self.assertEqual(len([p for p, _, _ in StubGitHub.requests if p.endswith("/repos")]), 1)
+
+    def test_unchanged_responses_are_revalidated(self):
+        client = self.github(per_page=5)
+        first = client.fetch_profile("alice")
+        second = client.fetch_profile("alice")
+
+        self.assertEqual(first, second)
+        self.assertEqual(
+            [etag for _, _, etag in StubGitHub.requests[2:]],
+            ['"user-v1"', '"repos-1"']
+        )
+
+    def test_error_status_raises(self):
+        with self.assertRaises(GitHubError):
+            self.github().get_user("nobody")
+
+
+class GradeTests(SimpleTestCase):
+    def test_ragged_attempts(self):
+        keys = [answer_key([{"correct_answer": "A"}, {"correct_answer": "B"}]), ["C"], []]
+        answers = [["A", "C", "extra"], [], []]
+
+        correct, percentage, passed = grade(keys, answers, [2, 1, 0], mark=50)
+
+        self.assertEqual(correct.tolist(), [1, 0, 0])
+        self.assertEqual(percentage.tolist(), [50.0, 0.0, 0.0])
+        self.assertEqual(passed.tolist(), [True, False, False])
+
+    def test_missing_key_never_matches(self):
+        # a question without correct_answer can't be answered correctly
+        keys = [answer_key([{"question": "q"}])]
+
+        correct, _, _ = grade(keys, [[None]], [1])
+
+        self.assertEqual(correct.tolist(), [0])
+
+
+class SkillMatcherTests(SimpleTestCase):
+    def test_whole_words_only(self):
+        found = text_matcher().find("JavaScript and C++ with React.js; ReactJS again")
+
+        self.assertEqual(found, {"JavaScript": 1, "C++": 1, "React": 2})
+        self.assertNotIn("Java", found)
+
+    def test_overlapping_patterns(self):
+        matcher = SkillMatcher({"he": "A", "she": "B", "hers": "C"})
+
+        self.assertEqual(matcher.find("she hers he"), {"B": 1, "C": 1, "A": 1})
+
+    def test_short_synonyms_only_in_lists(self):
+        self.assertEqual(skills_from_list("Go, js ; c\npy"), ["Go", "JavaScript", "C", "Python"])
+        self.assertNotIn("Go", text_matcher().find("ready to go"))
+
+    def test_primary_skill_prefers_profile(self):
+        self.assertEqual(primary_skill("golang, docker", "python python python"), "Go")
+        self.assertEqual(primary_skill("", "", {"TypeScript": 3, "Python": 1}), "TypeScript")
+        self.assertEqual(primary_skill(), "Python")
+
+
+class JobDedupeTests(TestCase):
+    def test_queued_key_is_shared(self):
+        first = enqueue("report", "builtins.print", dedupe_key="report:1", n=1)
+        second = enqueue("report", "builtins.print", dedupe_key="report:1", n=2)
+        other = enqueue("report", "builtins.print", dedupe_key="report:2")
+
+        self.assertEqual(first.id, second.id)
+        self.assertNotEqual(first.id, other.id)
+        self.assertEqual(BackgroundJob.objects.count(), 2)
+
+    def test_running_key_waits(self):
+        running = enqueue("report", "builtins.print", dedupe_key="report:1")
+        self.assertEqual(claim_next_job().id, running.id)
+
+        # a new run may queue behind the running one, but not start yet
+        queued = enqueue("report", "builtins.print", dedupe_key="report:1")
+        self.assertNotEqual(queued.id, running.id)
+        self.assertIsNone(claim_next_job())
+
+        run_job(running)
+        self.assertEqual(claim_next_job().id, queued.id)
@@ -7,6 +7,8 @@ urlpatterns = [
     path("personality/questions/", PersonalityQuestionsAPI.as_view()),
     path("personality/submit/", SubmitPersonalityAPI.as_view()),
     path("recommendation/", RecommendationAPI.as_view()),
+    path("jobs/<int:job_id>/", JobStatusAPI.as_view()),
+    path("metrics/llm/", LLMMetricsAPI.as_view()),
 
 
 
@@ -1,39 +1,170 @@
+import os
+import threading
+from collections import OrderedDict
+
 import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from dotenv import load_dotenv
 
-def fetch_github_profile(username):
+load_dotenv()
+
+
+class GitHubError(Exception):
+    pass
+
+
+class GitHubClient:
     """
-    Fetch basic GitHub user data and repos.
-    Returns a dict with prof info and repo details.
+    Small GitHub REST client.
+
+    - one pooled keep-alive Session per client
+    - conditional requests: responses are cached with their ETag and a
+      304 is answered from the cache (304s don't count against the
+      rate limit)
+    - follows `Link: rel="next"` pagination up to `max_repos`
+    - connect/read timeouts on every call
     """
-    base_url = "https://api.github.com/users/{}".format(username)
-    
-    # fetch profile info
-    profile_resp = requests.get(base_url)
-    if profile_resp.status_code != 200:
-        raise Exception(f"Failed to fetch profile: {profile_resp.text}")
-    profile_data = profile_resp.json()
-
-    # fetch repo info
-    repos_resp = requests.get(profile_data["repos_url"])
-    if repos_resp.status_code != 200:
-        raise Exception(f"Failed to fetch repos: {repos_resp.text}")
-    repos_data = repos_resp.json()
-
-    repo_list = []
-    for repo in repos_data:
-        repo_list.append({
-            "name": repo["name"],
-            "description": repo["description"],
-            "language": repo["language"],
-            "stars": repo["stargazers_count"],
-            "url": repo["html_url"]
+
+    def __init__(
+        self,
+        base_url="https://api.github.com",
+        token=None,
+        timeout=(3.05, 10),
+        max_repos=100,
+        per_page=100,
+        cache_size=512,
+        pool_size=10,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_repos = max_repos
+        self.per_page = per_page
+        self.cache_size = cache_size
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Accept": "application/vnd.github+json",
+            "User-Agent": "skillforge",
         })
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+        # url -> (etag, data, links)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cache_get(self, key):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry:
+                self._cache.move_to_end(key)
+            return entry
+
+    def _cache_set(self, key, entry):
+        with self._lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def get_json(self, url, params=None):
+        """GET `url`, returns (data, links). Revalidates cached responses."""
+        request = requests.Request("GET", url, params=params).prepare()
+        key = request.url
+
+        cached = self._cache_get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+
+        try:
+            resp = self.session.get(key, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise GitHubError(f"GitHub request failed: {e}") from e
+
+        if resp.status_code == 304 and cached:
+            return cached[1], cached[2]
+
+        if resp.status_code != 200:
+            raise GitHubError(f"GitHub returned {resp.status_code}: {resp.text}")
+
+        data = resp.json()
+        links = {rel: link["url"] for rel, link in resp.links.items()}
 
-    return {
-        "username": profile_data["login"],
-        "name": profile_data.get("name", ""),
-        "bio": profile_data.get("bio", ""),
-        "public_repos": profile_data["public_repos"],
-        "repos": repo_list
-    }
+        etag = resp.headers.get("ETag")
+        if etag:
+            self._cache_set(key, (etag, data, links))
 
+        return data, links
+
+    def get_user(self, username):
+        data, _ = self.get_json(f"{self.base_url}/users/{username}")
+        return data
+
+    def get_repos(self, repos_url):
+        repos = []
+        url = repos_url
+        # most recently pushed first, so max_repos keeps the active ones
+        # (GitHub's default order is alphabetical)
+        params = {"per_page": self.per_page, "sort": "pushed"}
+
+        while url and len(repos) < self.max_repos:
+            data, links = self.get_json(url, params)
+            repos.extend(data)
+            # the next link already carries the query string
+            url = links.get("next")
+            params = None
+
+        return repos[:self.max_repos]
+
+    def fetch_profile(self, username):
+        profile_data = self.get_user(username)
+        repos_data = self.get_repos(profile_data["repos_url"])
+
+        repo_list = []
+        for repo in repos_data:
+            repo_list.append({
+                "name": repo["name"],
+                "description": repo["description"],
+                "language": repo["language"],
+                "stars": repo["stargazers_count"],
+                "pushed_at": repo.get("pushed_at"),
+                "url": repo["html_url"]
+            })
+
+        return {
+            "username": profile_data["login"],
+            "name": profile_data.get("name", ""),
+            "bio": profile_data.get("bio", ""),
+            "public_repos": profile_data["public_repos"],
+            "repos": repo_list
+        }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_github_client():
+    """Process-wide client so the connection pool and ETag cache are shared."""
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            _client = GitHubClient(
+                base_url=getattr(settings, "GITHUB_API_URL", "https://api.github.com"),
+                token=os.getenv("GITHUB_TOKEN"),
+                timeout=getattr(settings, "GITHUB_TIMEOUT", (3.05, 10)),
+                max_repos=getattr(settings, "GITHUB_MAX_REPOS", 100),
+            )
+        return _client
+
+
+def fetch_github_profile(username):
+    """
+    Fetch basic GitHub user data and repos.
+    Returns a dict with prof info and repo details.
+    """
+    return get_github_client().fetch_profile(username)
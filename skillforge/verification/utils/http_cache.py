@@ -0,0 +1,43 @@
+import hashlib
+import json
+from functools import wraps
+
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+
+def conditional_get(version):
+    """
+    Decorator for an APIView `get` that answers If-None-Match with 304.
+
+    `version(request, *args, **kwargs)` must be cheap (one indexed query)
+    and change whenever the response body would, e.g. a max updated_at.
+    Returning None skips the ETag for that request. Responses are
+    private to the user and revalidated on every poll.
+    """
+    def etag(request, *args, **kwargs):
+        value = version(request, *args, **kwargs)
+        if value is None:
+            return None
+
+        raw = json.dumps([request.user.pk, value], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            @condition(etag_func=etag)
+            def view(request, *args, **kwargs):
+                return method(self, request, *args, **kwargs)
+
+            response = view(request, *args, **kwargs)
+
+            if response.status_code in (200, 304):
+                patch_cache_control(response, private=True, no_cache=True, max_age=0)
+                patch_vary_headers(response, ["Authorization"])
+
+            return response
+
+        return wrapper
+
+    return decorator
@@ -1,20 +1,38 @@
-from langchain_google_genai import GoogleGenerativeAI, ChatGoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser, JsonOutputParser
-from dotenv import load_dotenv
-import os
-load_dotenv()
-API_KEY = os.getenv("GEMINI_API_KEY")
-if not API_KEY:
-    raise ValueError("GEMINI_API_KEY or GOOGLE_API_KEY is missing. Set it in your .env file.")
-model = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",   
-    api_key=API_KEY
-)
+from django.conf import settings
+
+from .llm import parse_json, run_prompt, stream_prompt
+from .llm_metrics import estimate_tokens
+from .prompt_budget import chunk_text, map_in_threads, truncate_to_tokens
+def summarize_resume_chunk(resume_chunk: str) -> str:
+    template = """
+        You are an expert technical recruiter.
+        Summarise this part of a resume. Keep every skill, technology,
+        role, employer, date, project and achievement; drop everything else.
+        Resume part:
+        {resume_chunk}
+        """
+    return run_prompt("summarize_resume_chunk", template, {"resume_chunk": resume_chunk})
+def fit_resume(resume_text: str, max_rounds: int = 3) -> str:
+    """
+    Map-reduce an over-budget resume: summarise chunks in parallel and
+    join them, repeating until the result fits LLM_RESUME_TOKEN_BUDGET.
+    """
+    budget = getattr(settings, "LLM_RESUME_TOKEN_BUDGET", 6000)
+    chunk_tokens = getattr(settings, "LLM_RESUME_CHUNK_TOKENS", 3000)
+    # leave one of the user's LLM slots to the GitHub analysis running
+    # alongside, or the two can starve each other into LLMBusy
+    per_user = getattr(settings, "LLM_MAX_CONCURRENCY_PER_USER", 3)
+    workers = max(1, min(getattr(settings, "LLM_MAP_WORKERS", 2), per_user - 1))
+
+    for _ in range(max_rounds):
+        if estimate_tokens(resume_text) <= budget:
+            return resume_text
+        summaries = map_in_threads(summarize_resume_chunk, chunk_text(resume_text, chunk_tokens), workers)
+        resume_text = "\n\n".join(summaries)
+
+    return truncate_to_tokens(resume_text, budget)
 def analyze_resume(resume_text: str) -> str:
-    template = PromptTemplate(
-        input_variables=["resume_text"],
-        template="""
+    template = """
         You are an expert technical recruiter.
         Analyze the following resume text and provide:
         - Key strengths
@@ -23,13 +41,9 @@ def analyze_resume(resume_text: str) -> str:
         Resume:
         {resume_text}
         """
-    )
-    chain = template | model | StrOutputParser()
-    return chain.invoke({"resume_text": resume_text})
+    return run_prompt("analyze_resume", template, {"resume_text": fit_resume(resume_text)})
 def analyze_github_profile(github_profile: str) -> str:
-    template = PromptTemplate(
-        input_variables=["github_profile"],
-        template="""
+    template = """
         You are an expert technical recruiter.
         Analyze the following GitHub profile and provide:
         - Key strengths
@@ -38,13 +52,9 @@ def analyze_github_profile(github_profile: str) -> str:
         GitHub Profile URL:
         {github_profile}
         """
-    )
-    chain = template | model | StrOutputParser()
-    return chain.invoke({"github_profile": github_profile})
+    return run_prompt("analyze_github_profile", template, {"github_profile": github_profile})
 def generate_final_report(resume_analysis: str, github_analysis: str) -> str:
-    template = PromptTemplate(
-        input_variables=["resume_analysis", "github_analysis"],
-        template="""
+    template = """
         You are an expert technical recruiter.
         Based on the following analyses, generate a comprehensive final report.
         Resume Analysis:
@@ -53,14 +63,9 @@ def generate_final_report(resume_analysis: str, github_analysis: str) -> str:
         {github_analysis}
         Final Report:
         """
-    )
-    chain = template | model | StrOutputParser()
-    return chain.invoke({"resume_analysis": resume_analysis, "github_analysis": github_analysis})
-def generate_test(resume_analysis: str, github_analysis: str, skills=None, recommendation=None, num_questions=5, role_hint="Developer") -> str:
-    parser = JsonOutputParser()
-    template = PromptTemplate(
-        input_variables=["resume_analysis", "github_analysis", "skills", "recommendation", "num_questions", "role_hint"],
-        template="""
+    return run_prompt("generate_final_report", template, {"resume_analysis": resume_analysis, "github_analysis": github_analysis})
+def generate_test(resume_analysis: str, github_analysis: str, skills=None, recommendation=None, num_questions=5, role_hint="Developer", stream=False) -> str:
+    template = """
         Based on these analyses and provided skills:
         Resume Analysis:
         {resume_analysis}
@@ -90,24 +95,61 @@ def generate_test(resume_analysis: str, github_analysis: str, skills=None, recom
             "answers": ["B", "A", "D", "C", "B"]
         }}
         """
-    )
-    chain = template | model | parser
-    r=chain.invoke({
+    inputs = {
         "resume_analysis": resume_analysis,
         "github_analysis": github_analysis,
         "skills": skills,
         "recommendation": recommendation,
         "num_questions": num_questions,
         "role_hint": role_hint
-    })
+    }
+    # not cached: a retake must get a fresh set of questions
+    if stream:
+        return stream_prompt("generate_test", template, inputs, parser="json", use_cache=False)
+    r=run_prompt("generate_test", template, inputs, parser="json", use_cache=False)
     return r
 
-from langchain.prompts import PromptTemplate
-import json,re
+RECOMMENDED_TAGS = ("Beginner", "Intermediate", "Expert")
+
+
+def _string_list(value):
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def normalize_final_analysis(data) -> dict:
+    """
+    Validate final_analysis output (raw text or parsed JSON) into
+    {"star_rating": float 1-5, "strengths", "weaknesses", "recommended_tags"}.
+    Raises ValueError when the output is unusable.
+    """
+    if isinstance(data, str):
+        data = parse_json(data)
+    if not isinstance(data, dict):
+        raise ValueError("final_analysis did not return a JSON object")
+
+    try:
+        rating = float(data.get("star_rating"))
+    except (TypeError, ValueError):
+        raise ValueError("final_analysis returned no numeric star_rating")
+
+    tags = [
+        tag.capitalize() for tag in _string_list(data.get("recommended_tags"))
+        if tag.capitalize() in RECOMMENDED_TAGS
+    ]
+
+    return {
+        "star_rating": round(min(max(rating, 1.0), 5.0), 1),
+        "strengths": _string_list(data.get("strengths")),
+        "weaknesses": _string_list(data.get("weaknesses")),
+        "recommended_tags": tags,
+    }
+
 def final_analysis(resume_analysis:str,github_analysis:str,previous_recommendation:str,test_score:float,test_result:str):
-    prompt=PromptTemplate(
-        input_variables=["resume_analysis","github_analysis","previous_recommendation","test_score","test_result"],
-        template="""
+    prompt="""
         You are an expert technical evaluator.
         Based on the following details, provide a final structured analysis of the candidate.
         Resume Analysis:
@@ -128,8 +170,6 @@ def final_analysis(resume_analysis:str,github_analysis:str,previous_recommendati
         }}
         Do not include any explanations or extra text.
         """
-    )
-    parser=StrOutputParser()
-    chain=prompt|model|parser
-    response=chain.invoke({"resume_analysis":resume_analysis,"github_analysis":github_analysis,"previous_recommendation":previous_recommendation,"test_score":test_score,"test_result":test_result})
-    return response
+    response=run_prompt("final_analysis",prompt,{"resume_analysis":resume_analysis,"github_analysis":github_analysis,"previous_recommendation":previous_recommendation,"test_score":test_score,"test_result":test_result},parser=normalize_final_analysis)
+    # older cache entries hold the raw text
+    return normalize_final_analysis(response)
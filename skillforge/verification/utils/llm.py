@@ -0,0 +1,210 @@
+"""
+Shared LLM access for all apps.
+
+The backend is picked by settings.LLM_BACKEND ("gemini", "fake" or a
+dotted path to a backend class) and built on first use. Nothing here
+imports langchain at module load, so management commands, migrations
+and tests that never call the LLM don't pay for it (and don't need
+GEMINI_API_KEY).
+"""
+import json
+import re
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from dotenv import load_dotenv
+
+from .llm_backends import FakeBackend, GeminiBackend
+from .llm_cache import llm_cache, prompt_key
+from .llm_limiter import LLMBusy, current_llm_user, llm_slot
+from .llm_metrics import estimate_tokens, llm_metrics
+
+load_dotenv()
+
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "fake": FakeBackend,
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name=None):
+    """The configured LLM backend, constructed once per process."""
+    name = name or getattr(settings, "LLM_BACKEND", "gemini")
+
+    with _backends_lock:
+        if name not in _backends:
+            backend_class = BACKENDS.get(name) or import_string(name)
+
+            options = {"model_name": getattr(settings, "LLM_MODEL", "gemini-2.5-flash")}
+            if name == "fake":
+                options = {"latency": getattr(settings, "LLM_FAKE_LATENCY", 0.0)}
+
+            _backends[name] = backend_class(**options)
+
+        return _backends[name]
+
+
+def parse_json(text):
+    """Parse model output as JSON, tolerating ``` fences and chatter around it."""
+    if not isinstance(text, str):
+        return text
+
+    cleaned = re.sub(r"```[\w]*", "", text).strip()
+
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        start, end = cleaned.find("{"), cleaned.rfind("}")
+        if start == -1 or end <= start:
+            raise
+        return json.loads(cleaned[start:end + 1])
+
+
+def _parse(text, parser):
+    if callable(parser):
+        return parser(text)
+    return parse_json(text) if parser == "json" else text
+
+
+def _cache_enabled(use_cache):
+    return use_cache and getattr(settings, "LLM_CACHE_ENABLED", True)
+
+
+def _enter_slot(stack, prompt_name):
+    """Hold a concurrency slot for the current user until `stack` closes."""
+    started = time.perf_counter()
+    try:
+        stack.enter_context(llm_slot(current_llm_user()))
+    except LLMBusy:
+        llm_metrics.record(prompt_name, time.perf_counter() - started, status="throttled")
+        raise
+
+
+def _invoke(backend, prompt_name, prompt, inputs, parser):
+    """
+    One instrumented LLM call. Output that fails to parse is retried up
+    to LLM_PARSE_RETRIES times before the error is raised.
+    """
+    max_retries = getattr(settings, "LLM_PARSE_RETRIES", 1)
+    prompt_tokens = estimate_tokens(prompt)
+    completion_tokens = 0
+    retries = 0
+    parse_failures = 0
+    started = time.perf_counter()
+
+    while True:
+        try:
+            text = backend.invoke(prompt_name, prompt, inputs)
+        except Exception:
+            llm_metrics.record(
+                prompt_name, time.perf_counter() - started, prompt_tokens,
+                completion_tokens, status="error", retries=retries,
+                parse_failures=parse_failures
+            )
+            raise
+
+        completion_tokens += estimate_tokens(text)
+
+        try:
+            value = _parse(text, parser)
+        except ValueError:
+            parse_failures += 1
+            if retries < max_retries:
+                retries += 1
+                continue
+
+            llm_metrics.record(
+                prompt_name, time.perf_counter() - started, prompt_tokens,
+                completion_tokens, status="parse_error", retries=retries,
+                parse_failures=parse_failures
+            )
+            raise
+
+        llm_metrics.record(
+            prompt_name, time.perf_counter() - started, prompt_tokens,
+            completion_tokens, retries=retries, parse_failures=parse_failures
+        )
+        return value
+
+
+def run_prompt(prompt_name, template, inputs, parser="str", use_cache=True):
+    """
+    Render `template` with `inputs`, run it on the configured backend and
+    parse the output ("str", "json" or a callable that raises ValueError
+    on bad output). Byte-identical prompts are answered from the
+    response cache.
+    """
+    backend = get_backend()
+
+    if _cache_enabled(use_cache):
+        key = prompt_key(backend.model_name, template, inputs)
+
+        hit, value = llm_cache.get(key)
+        if hit:
+            llm_metrics.record_cache_hit(prompt_name)
+            return value
+
+    prompt = template.format(**inputs)
+
+    with ExitStack() as stack:
+        _enter_slot(stack, prompt_name)
+        value = _invoke(backend, prompt_name, prompt, inputs, parser)
+
+    if _cache_enabled(use_cache):
+        llm_cache.set(key, value, prompt_name=prompt_name, model_name=backend.model_name)
+
+    return value
+
+
+def stream_prompt(prompt_name, template, inputs, parser="str", use_cache=True):
+    """
+    Streaming counterpart of run_prompt. Yields ("token", text) as the
+    model writes and finally ("result", parsed value); a cache hit yields
+    only the result.
+    """
+    backend = get_backend()
+
+    if _cache_enabled(use_cache):
+        key = prompt_key(backend.model_name, template, inputs)
+
+        hit, value = llm_cache.get(key)
+        if hit:
+            llm_metrics.record_cache_hit(prompt_name)
+            yield "result", value
+            return
+
+    prompt = template.format(**inputs)
+    status = "error"
+    chunks = []
+
+    with ExitStack() as stack:
+        _enter_slot(stack, prompt_name)
+        started = time.perf_counter()
+
+        try:
+            for chunk in backend.stream(prompt_name, prompt, inputs):
+                chunks.append(chunk)
+                yield "token", chunk
+
+            # tokens are already out, so a bad parse can't be retried here
+            status = "parse_error"
+            value = _parse("".join(chunks), parser)
+            status = "ok"
+
+        finally:
+            llm_metrics.record(
+                prompt_name, time.perf_counter() - started,
+                estimate_tokens(prompt), estimate_tokens("".join(chunks)),
+                status=status, parse_failures=int(status == "parse_error")
+            )
+
+    if _cache_enabled(use_cache):
+        llm_cache.set(key, value, prompt_name=prompt_name, model_name=backend.model_name)
+
+    yield "result", value
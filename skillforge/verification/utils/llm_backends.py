@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+class GeminiBackend:
+    """Google Gemini through langchain, imported and built on first use."""
+
+    def __init__(self, model_name="gemini-2.5-flash", **options):
+        self.model_name = model_name
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+
+            api_key = os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                raise ImproperlyConfigured(
+                    "GEMINI_API_KEY is missing. Set it in your .env file."
+                )
+
+            self._model = ChatGoogleGenerativeAI(
+                model=self.model_name,
+                google_api_key=api_key
+            )
+
+        return self._model
+
+    def invoke(self, prompt_name, prompt, inputs):
+        return self.model.invoke(prompt).content
+
+    def stream(self, prompt_name, prompt, inputs):
+        for chunk in self.model.stream(prompt):
+            yield chunk.content
+
+
+def _seed(inputs):
+    raw = json.dumps(inputs, sort_keys=True, default=str)
+    return int(hashlib.sha256(raw.encode("utf-8")).hexdigest(), 16)
+
+
+def _fake_analysis(inputs):
+    return (
+        "Key strengths:\n- Solid fundamentals\n- Consistent project work\n"
+        "Weaknesses:\n- Limited production experience\n"
+        "Suggestions for improvement:\n- Add tests and documentation to projects"
+    )
+
+
+def _fake_summary(inputs):
+    text = inputs.get("resume_chunk") or ""
+    return f"Summary of {len(text)} characters: experienced developer, projects listed."
+
+
+def _fake_test(inputs):
+    count = int(inputs.get("num_questions") or 5)
+    role = inputs.get("role_hint") or "Developer"
+    seed = _seed(inputs)
+    letters = ["A", "B", "C", "D"]
+    difficulties = ["Easy", "Medium", "Hard"]
+
+    questions = []
+    for i in range(count):
+        questions.append({
+            "question": f"{role} question {i + 1}: which option is correct?",
+            "options": letters,
+            "type": "theory",
+            "difficulty": difficulties[i % 3],
+            "correct_answer": letters[(seed + i) % 4],
+        })
+
+    return json.dumps({
+        "role": role,
+        "questions": questions,
+        "answers": [q["correct_answer"] for q in questions],
+    })
+
+
+def _fake_final_analysis(inputs):
+    try:
+        score = float(inputs.get("test_score") or 0)
+    except (TypeError, ValueError):
+        score = 0.0
+
+    if score >= 80:
+        tag = "Expert"
+    elif score >= 50:
+        tag = "Intermediate"
+    else:
+        tag = "Beginner"
+
+    return json.dumps({
+        "star_rating": round(min(max(score / 20, 1), 5), 1),
+        "strengths": ["Problem solving", "Core language knowledge"],
+        "weaknesses": ["System design"],
+        "recommended_tags": [tag],
+    })
+
+
+def _fake_module(inputs):
+    topic = inputs.get("topic") or "Topic"
+    level = inputs.get("level") or "average"
+
+    return json.dumps({
+        "content": f"# {topic}\n\n## Overview\n\nAn introduction to {topic}.\n\n## Exercises\n\n1. Build a small project.",
+        "metadata": {
+            "difficulty": level,
+            "estimated_hours": 4,
+            "tags": [topic.lower()],
+            "prerequisites": [],
+        },
+    })
+
+
+class FakeBackend:
+    """
+    Deterministic offline backend for load tests and local runs.
+    Returns schema-valid responses per prompt name after `latency` seconds.
+    """
+
+    responses = {
+        "analyze_resume": _fake_analysis,
+        "summarize_resume_chunk": _fake_summary,
+        "analyze_github_profile": _fake_analysis,
+        "generate_final_report": _fake_analysis,
+        "generate_test": _fake_test,
+        "final_analysis": _fake_final_analysis,
+        "generate_learning_module": _fake_module,
+    }
+
+    def __init__(self, model_name="fake", latency=0.0, chunk_size=24, **options):
+        self.model_name = model_name
+        self.latency = latency
+        self.chunk_size = chunk_size
+
+    def respond(self, prompt_name, inputs):
+        handler = self.responses.get(prompt_name, _fake_analysis)
+        return handler(inputs)
+
+    def invoke(self, prompt_name, prompt, inputs):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.respond(prompt_name, inputs)
+
+    def stream(self, prompt_name, prompt, inputs):
+        text = self.respond(prompt_name, inputs)
+        chunks = [
+            text[i:i + self.chunk_size]
+            for i in range(0, len(text), self.chunk_size)
+        ] or [""]
+
+        # spread the latency over the chunks like a real stream
+        delay = self.latency / len(chunks) if self.latency else 0
+        for chunk in chunks:
+            if delay:
+                time.sleep(delay)
+            yield chunk
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+
+
+def prompt_key(model_name: str, template: str, inputs: dict) -> str:
+    """Content address of a prompt: same model + template + inputs -> same key."""
+    raw = json.dumps(
+        [model_name, template, inputs],
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Two-tier cache for LLM responses.
+
+    The memory tier is a per-process LRU; the database tier
+    (LLMCacheEntry) is shared by web and worker processes.
+    Both honour the same TTL and are capped by entry count.
+    """
+
+    def __init__(self, ttl=None, max_memory_entries=None, max_db_entries=None):
+        self.ttl = ttl or getattr(settings, "LLM_CACHE_TTL", 60 * 60 * 24 * 7)
+        self.max_memory_entries = max_memory_entries or getattr(settings, "LLM_CACHE_MEMORY_ENTRIES", 256)
+        self.max_db_entries = max_db_entries or getattr(settings, "LLM_CACHE_DB_ENTRIES", 5000)
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+        }
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._stats[name] += n
+
+    def _remember(self, key, value, expires_at):
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get(self, key):
+        """Returns (hit, value)."""
+        from verification.models import LLMCacheEntry
+
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[0] > now:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return True, entry[1]
+            if entry:
+                del self._memory[key]
+
+        row = LLMCacheEntry.objects.filter(
+            key=key,
+            expires_at__gt=timezone.now()
+        ).values_list("response", "expires_at").first()
+
+        if row is None:
+            self._count("misses")
+            return False, None
+
+        value, expires_at = row
+        self._remember(key, value, expires_at.timestamp())
+        self._count("db_hits")
+
+        return True, value
+
+    def set(self, key, value, prompt_name="", model_name=""):
+        from verification.models import LLMCacheEntry
+
+        expires_at = timezone.now() + timedelta(seconds=self.ttl)
+        self._remember(key, value, expires_at.timestamp())
+
+        try:
+            LLMCacheEntry.objects.update_or_create(
+                key=key,
+                defaults={
+                    "prompt_name": prompt_name,
+                    "model_name": model_name,
+                    "response": value,
+                    "expires_at": expires_at,
+                }
+            )
+        except IntegrityError:
+            # another process stored the same prompt first
+            pass
+
+        self._count("sets")
+        self._prune()
+
+    def _prune(self):
+        from verification.models import LLMCacheEntry
+
+        LLMCacheEntry.objects.filter(expires_at__lte=timezone.now()).delete()
+
+        excess = LLMCacheEntry.objects.count() - self.max_db_entries
+        if excess > 0:
+            oldest = LLMCacheEntry.objects.order_by("created_at")\
+                                          .values_list("id", flat=True)[:excess]
+            deleted, _ = LLMCacheEntry.objects.filter(id__in=list(oldest)).delete()
+            self._count("evictions", deleted)
+
+    def clear(self):
+        from verification.models import LLMCacheEntry
+
+        with self._lock:
+            self._memory.clear()
+        LLMCacheEntry.objects.all().delete()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+
+        lookups = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+        hits = stats["memory_hits"] + stats["db_hits"]
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+
+        return stats
+
+
+llm_cache = LLMCache()
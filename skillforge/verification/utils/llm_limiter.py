@@ -0,0 +1,164 @@
+import contextvars
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+
+class LLMBusy(Exception):
+    """No LLM slot became free before the caller's deadline."""
+
+
+_current_user = contextvars.ContextVar("llm_user", default=None)
+
+
+@contextmanager
+def llm_user(user_id):
+    """Attribute LLM calls made inside the block to `user_id`."""
+    token = _current_user.set(user_id)
+    try:
+        yield
+    finally:
+        _current_user.reset(token)
+
+
+def current_llm_user():
+    return _current_user.get()
+
+
+_process_semaphore = None
+_process_lock = threading.Lock()
+_slots_ready = False
+
+
+def _get_process_semaphore():
+    global _process_semaphore
+
+    with _process_lock:
+        if _process_semaphore is None:
+            _process_semaphore = threading.BoundedSemaphore(
+                getattr(settings, "LLM_PROCESS_CONCURRENCY", 4)
+            )
+        return _process_semaphore
+
+
+def _ensure_slots(total):
+    global _slots_ready
+    from verification.models import LLMSlot
+
+    if _slots_ready:
+        return
+
+    LLMSlot.objects.bulk_create(
+        [LLMSlot(slot=i) for i in range(total)],
+        ignore_conflicts=True
+    )
+    _slots_ready = True
+
+
+def _try_claim(holder, user_id, total, per_user):
+    """
+    Claim a free (or expired) slot with a conditional update, which is
+    atomic across processes. Returns the slot number or None.
+    """
+    from verification.models import LLMSlot
+
+    now = timezone.now()
+    free = Q(holder="") | Q(expires_at__lt=now)
+    slots = LLMSlot.objects.filter(slot__lt=total)
+    limit_user = user_id is not None and per_user
+
+    def held_by_user():
+        return slots.filter(user_id=user_id, expires_at__gte=now)\
+                    .exclude(holder="")\
+                    .count()
+
+    if limit_user and held_by_user() >= per_user:
+        return None
+
+    candidates = list(slots.filter(free).values_list("slot", flat=True))
+    random.shuffle(candidates)
+
+    for slot in candidates:
+        claimed = LLMSlot.objects.filter(free, slot=slot).update(
+            holder=holder,
+            user_id=user_id,
+            expires_at=now + timedelta(seconds=getattr(settings, "LLM_LEASE_TTL", 180))
+        )
+        if not claimed:
+            continue
+
+        # two requests from one user can pass the check above together;
+        # recount with our slot held and back off if that went over
+        if limit_user and held_by_user() > per_user:
+            _release(slot, holder)
+            return None
+
+        return slot
+
+    return None
+
+
+def _release(slot, holder):
+    from verification.models import LLMSlot
+
+    LLMSlot.objects.filter(slot=slot, holder=holder).update(
+        holder="",
+        user_id=None,
+        expires_at=None
+    )
+
+
+@contextmanager
+def llm_slot(user_id=None, timeout=None):
+    """
+    Hold one LLM concurrency slot for the duration of the block.
+
+    Calls first queue on a per-process semaphore, then on the shared
+    database slots (global cap plus per-user cap). Raises LLMBusy if no
+    slot is free within `timeout` seconds (LLM_QUEUE_TIMEOUT).
+    """
+    if not getattr(settings, "LLM_LIMITER_ENABLED", True):
+        yield
+        return
+
+    timeout = timeout if timeout is not None else getattr(settings, "LLM_QUEUE_TIMEOUT", 30)
+    deadline = time.monotonic() + timeout
+
+    semaphore = _get_process_semaphore()
+    if not semaphore.acquire(timeout=timeout):
+        raise LLMBusy("Too many LLM calls in this process")
+
+    try:
+        total = getattr(settings, "LLM_MAX_CONCURRENCY", 8)
+        per_user = getattr(settings, "LLM_MAX_CONCURRENCY_PER_USER", 3)
+        _ensure_slots(total)
+
+        holder = uuid.uuid4().hex
+        delay = 0.05
+
+        while True:
+            slot = _try_claim(holder, user_id, total, per_user)
+            if slot is not None:
+                break
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LLMBusy("No LLM slot became free in time")
+
+            time.sleep(min(remaining, delay * random.uniform(0.5, 1.5)))
+            delay = min(delay * 2, 1.0)
+
+        try:
+            yield
+        finally:
+            _release(slot, holder)
+
+    finally:
+        semaphore.release()
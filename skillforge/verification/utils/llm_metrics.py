@@ -0,0 +1,219 @@
+import json
+import logging
+import math
+import os
+import socket
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+logger = logging.getLogger("skillforge.llm")
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60, math.inf)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, math.inf)
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token) for prompts and replies."""
+    return max(1, len(text or "") // 4)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+    def snapshot(self):
+        # cumulative counts, Prometheus style
+        cumulative = []
+        running = 0
+        for bound, n in zip(self.buckets, self.counts):
+            running += n
+            cumulative.append(["+Inf" if bound == math.inf else bound, running])
+
+        return {
+            "buckets": cumulative,
+            "sum": round(self.total, 4),
+            "count": self.count,
+        }
+
+
+class PromptStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.parse_failures = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.prompt_tokens = Histogram(TOKEN_BUCKETS)
+        self.completion_tokens = Histogram(TOKEN_BUCKETS)
+
+    def snapshot(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "parse_failures": self.parse_failures,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "latency_seconds": self.latency.snapshot(),
+            "prompt_tokens": self.prompt_tokens.snapshot(),
+            "completion_tokens": self.completion_tokens.snapshot(),
+        }
+
+
+def _merge_histograms(a, b):
+    return {
+        "buckets": [[bound, x + y] for (bound, x), (_, y) in zip(a["buckets"], b["buckets"])],
+        "sum": round(a["sum"] + b["sum"], 4),
+        "count": a["count"] + b["count"],
+    }
+
+
+def merge_snapshots(snapshots):
+    """Sum per-prompt snapshots from several processes."""
+    merged = {}
+    for snapshot in snapshots:
+        for name, data in snapshot.items():
+            if name not in merged:
+                merged[name] = data
+                continue
+            merged[name] = {
+                key: _merge_histograms(value, data[key]) if isinstance(value, dict) else value + data[key]
+                for key, value in merged[name].items()
+            }
+    return merged
+
+
+class LLMMetrics:
+    """
+    Per-process metrics for LLM calls, labelled by prompt name. Every
+    call is also logged as one JSON line on the "skillforge.llm" logger.
+
+    Each process writes its snapshot to LLMMetricsSnapshot at most every
+    LLM_METRICS_FLUSH_INTERVAL seconds (workers after every job), and
+    shared_snapshot() sums them, so the web endpoint also sees the calls
+    made by run_jobs workers.
+    """
+
+    def __init__(self):
+        self._stats = defaultdict(PromptStats)
+        self._lock = threading.Lock()
+        self._process = None
+        self._flushed_at = 0.0
+
+    def record(self, prompt_name, seconds, prompt_tokens=0, completion_tokens=0,
+               status="ok", retries=0, parse_failures=0):
+        with self._lock:
+            stats = self._stats[prompt_name]
+            stats.calls += 1
+            stats.retries += retries
+            stats.parse_failures += parse_failures
+            if status != "ok":
+                stats.errors += 1
+            stats.latency.observe(seconds)
+            stats.prompt_tokens.observe(prompt_tokens)
+            stats.completion_tokens.observe(completion_tokens)
+
+        self.flush()
+
+        logger.info(json.dumps({
+            "event": "llm_call",
+            "prompt": prompt_name,
+            "status": status,
+            "seconds": round(seconds, 4),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "retries": retries,
+            "parse_failures": parse_failures,
+        }))
+
+    def record_cache_hit(self, prompt_name):
+        with self._lock:
+            self._stats[prompt_name].cache_hits += 1
+
+        self.flush()
+
+    def process_key(self):
+        # per pid, so forked workers don't share a row
+        pid = os.getpid()
+        if self._process is None or self._process[0] != pid:
+            self._process = (pid, f"{socket.gethostname()}:{pid}:{int(time.time())}")
+        return self._process[1]
+
+    def flush(self, force=False):
+        """Write this process's snapshot for shared_snapshot()."""
+        from verification.models import LLMMetricsSnapshot
+
+        interval = getattr(settings, "LLM_METRICS_FLUSH_INTERVAL", 10)
+        now = time.monotonic()
+        if not force and now - self._flushed_at < interval:
+            return
+        self._flushed_at = now
+
+        try:
+            LLMMetricsSnapshot.objects.update_or_create(
+                process=self.process_key(),
+                defaults={"data": self.snapshot()}
+            )
+        except DatabaseError:
+            # metrics must never fail an LLM call
+            logger.warning("Could not store LLM metrics snapshot", exc_info=True)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: stats.snapshot() for name, stats in self._stats.items()}
+
+    def shared_snapshot(self):
+        """Metrics summed over every process that reported recently."""
+        from verification.models import LLMMetricsSnapshot
+
+        self.flush(force=True)
+
+        retention = getattr(settings, "LLM_METRICS_RETENTION", 60 * 60 * 24 * 7)
+        LLMMetricsSnapshot.objects.filter(
+            updated_at__lt=timezone.now() - timedelta(seconds=retention)
+        ).delete()
+
+        return merge_snapshots(LLMMetricsSnapshot.objects.values_list("data", flat=True))
+
+    def prometheus(self, snapshot=None):
+        """Text exposition format for scraping."""
+        lines = []
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        for name, data in sorted(snapshot.items()):
+            label = f'prompt="{name}"'
+
+            for counter in ("calls", "errors", "parse_failures", "retries", "cache_hits"):
+                lines.append(f"llm_{counter}_total{{{label}}} {data[counter]}")
+
+            for metric in ("latency_seconds", "prompt_tokens", "completion_tokens"):
+                hist = data[metric]
+                for bound, count in hist["buckets"]:
+                    lines.append(f'llm_{metric}_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f"llm_{metric}_sum{{{label}}} {hist['sum']}")
+                lines.append(f"llm_{metric}_count{{{label}}} {hist['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+llm_metrics = LLMMetrics()
@@ -1,18 +1,86 @@
+import hashlib
+import io
+import multiprocessing
 import os
 import PyPDF2 
+from django.conf import settings
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def extract_text_from_pdf_fileobj(file_field):
-    """Reads a PDF file from Django FileField and returns extracted text."""
-    text = ""
+
+class PDFExtractionTimeout(Exception):
+    pass
+
+
+def read_file_bytes(file_field):
+    """Reads the whole Django FileField into memory."""
+    file_field.open("rb")
     try:
-        file_field.open("rb")
-        reader = PyPDF2.PdfReader(file_field)
-        for page in reader.pages:
-            text += page.extract_text() or ""
+        return file_field.read()
+    finally:
         file_field.close()
-    except Exception as e:
-        text = f"Error extracting text: {str(e)}"
-    return text.strip()
+
+
+def sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def iter_pdf_pages(data, max_pages=None):
+    """Yields the text of each page lazily, stopping after `max_pages`."""
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    for i, page in enumerate(reader.pages):
+        if max_pages is not None and i >= max_pages:
+            break
+        yield page.extract_text() or ""
+
+
+def extract_text_from_pdf_bytes(data, max_pages=None, max_chars=None):
+    """
+    Parses PDF bytes and returns extracted text, bounded by a page and
+    character budget. Raises on bad input.
+    """
+    parts = []
+    total = 0
+    for text in iter_pdf_pages(data, max_pages):
+        if max_chars is not None and total + len(text) >= max_chars:
+            parts.append(text[:max_chars - total])
+            break
+        parts.append(text)
+        total += len(text)
+    return "".join(parts).strip()
+
+
+def extract_text_isolated(data, max_pages=None, max_chars=None, timeout=20):
+    """
+    Runs extraction in a separate process that is killed after `timeout`
+    seconds, so a pathological PDF can't pin the caller.
+    """
+    # spawn: we may be called from a thread pool, where fork is unsafe
+    pool = multiprocessing.get_context("spawn").Pool(processes=1)
+    try:
+        result = pool.apply_async(
+            extract_text_from_pdf_bytes,
+            (data, max_pages, max_chars)
+        )
+        return result.get(timeout=timeout)
+    except multiprocessing.TimeoutError:
+        raise PDFExtractionTimeout(f"PDF extraction exceeded {timeout}s")
+    finally:
+        pool.terminate()
+
+
+def extract_resume_text(data):
+    """Extraction with the limits from settings (PDF_MAX_PAGES etc.)."""
+    max_pages = getattr(settings, "PDF_MAX_PAGES", None)
+    max_chars = getattr(settings, "PDF_MAX_CHARS", None)
+
+    if getattr(settings, "PDF_EXTRACT_ISOLATED", False):
+        return extract_text_isolated(
+            data,
+            max_pages,
+            max_chars,
+            timeout=getattr(settings, "PDF_EXTRACT_TIMEOUT", 20)
+        )
+
+    return extract_text_from_pdf_bytes(data, max_pages, max_chars)
@@ -0,0 +1,117 @@
+"""
+Keep prompt inputs inside a token budget.
+
+Token counts use the same ~4 chars/token estimate as the LLM metrics,
+which is close enough for Gemini to keep requests well under the limit.
+"""
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections
+
+from .llm_metrics import estimate_tokens
+
+CHARS_PER_TOKEN = 4
+
+
+def truncate_to_tokens(text, max_tokens):
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0]
+
+
+def chunk_text(text, max_tokens):
+    """
+    Split `text` into pieces of at most `max_tokens`, preferring
+    paragraph, then line, then word boundaries.
+    """
+    limit = max_tokens * CHARS_PER_TOKEN
+    chunks = []
+    current = ""
+
+    for paragraph in text.split("\n\n"):
+        if len(current) + len(paragraph) + 2 <= limit:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+            continue
+
+        if current:
+            chunks.append(current)
+            current = ""
+
+        # a single paragraph longer than the limit gets cut further
+        while len(paragraph) > limit:
+            cut = paragraph.rfind("\n", 0, limit)
+            if cut <= 0:
+                cut = paragraph.rfind(" ", 0, limit)
+            if cut <= 0:
+                cut = limit
+            chunks.append(paragraph[:cut])
+            paragraph = paragraph[cut:].lstrip()
+
+        current = paragraph
+
+    if current:
+        chunks.append(current)
+
+    return chunks
+
+
+def map_in_threads(func, items, max_workers=4):
+    """
+    `list(map(func, items))` run on a thread pool. Each call keeps the
+    caller's context (LLM user attribution) and closes its DB connection.
+    """
+    def call(item):
+        try:
+            return func(item)
+        finally:
+            connections.close_all()
+
+    if len(items) <= 1:
+        return [func(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        futures = [
+            pool.submit(contextvars.copy_context().run, call, item)
+            for item in items
+        ]
+        return [future.result() for future in futures]
+
+
+def _drop_empty(data):
+    return {key: value for key, value in data.items() if value not in (None, "", [], {})}
+
+
+def compact_github_profile(github_data, max_repos=30, max_tokens=3000):
+    """
+    Compact JSON for the GitHub prompt: empty fields dropped, repos ranked
+    by stars then most recent push, and trimmed until the budget fits.
+    """
+    repos = sorted(
+        github_data.get("repos") or [],
+        key=lambda repo: (repo.get("stars") or 0, repo.get("pushed_at") or ""),
+        reverse=True
+    )[:max_repos]
+
+    profile = _drop_empty({key: value for key, value in github_data.items() if key != "repos"})
+    profile["repos"] = []
+
+    for repo in repos:
+        repo = _drop_empty(repo)
+        if repo.get("description"):
+            repo["description"] = repo["description"][:200]
+        profile["repos"].append(repo)
+
+    def dump():
+        return json.dumps(profile, separators=(",", ":"), ensure_ascii=False)
+
+    text = dump()
+    while profile["repos"] and estimate_tokens(text) > max_tokens:
+        # drop the lowest ranked quarter at a time
+        keep = len(profile["repos"]) * 3 // 4
+        profile["repos"] = profile["repos"][:keep]
+        text = dump()
+
+    return truncate_to_tokens(text, max_tokens)
@@ -0,0 +1,24 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+
+def wants_stream(request):
+    """Streaming is opt-in with ?stream=1 (or "stream": true in the body)."""
+    flag = request.query_params.get("stream") or request.data.get("stream")
+    return str(flag).lower() in ("1", "true", "yes")
+
+
+def sse_event(event, data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def sse_response(events):
+    """Wrap a generator of sse_event() strings in a text/event-stream response."""
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # stop nginx from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
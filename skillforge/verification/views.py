@@ -1,25 +1,46 @@
+import hashlib
+import json
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from django.http import HttpResponse
 from rest_framework.response import Response
 from rest_framework import status
 from .services import submit_personality_assessment
 from .personality_data import PERSONALITY_QUESTIONS
 from .services import *
+from .jobs import get_job_status
+from .utils.sse import wants_stream, sse_event, sse_response
+from .utils.http_cache import conditional_get
+from .utils.llm_cache import llm_cache
+from .utils.llm_metrics import llm_metrics
+from .models import BackgroundJob
+
+def serialize_attempt(attempt):
+    return {
+        "attempt_id": attempt.id,
+        "session_id": attempt.proctor_session.id if attempt.proctor_session else None,
+        "category": attempt.category.name,
+        "questions": attempt.generated_questions,
+        "total_questions": attempt.total_questions
+    }
+
 
 class GenerateSkillTestAPI(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
+        personalised = bool(request.data.get("personalised"))
+
+        if wants_stream(request):
+            return sse_response(self.stream(request.user.id, personalised))
+
         try:
-            attempt = generate_skill_test_for_student(request.user.id)
+            attempt = generate_skill_test_for_student(
+                request.user.id,
+                personalised=personalised
+            )
 
-            return Response({
-                "attempt_id": attempt.id,
-                "session_id": attempt.proctor_session.id if attempt.proctor_session else None,
-                "category": attempt.category.name,
-                "questions": attempt.generated_questions,
-                "total_questions": attempt.total_questions
-            })
+            return Response(serialize_attempt(attempt))
 
         except Exception:
             return Response(
@@ -28,6 +49,17 @@ class GenerateSkillTestAPI(APIView):
             )
 
 
+    def stream(self, user_id, personalised):
+        try:
+            for event, value in stream_skill_test_for_student(user_id, personalised=personalised):
+                if event == "token":
+                    yield sse_event("token", value)
+                else:
+                    yield sse_event("done", serialize_attempt(value))
+
+        except Exception:
+            yield sse_event("error", {"error": "Failed to generate test"})
+
 
 class SubmitSkillTestAPI(APIView):
     permission_classes = [IsAuthenticated]
@@ -50,9 +82,16 @@ class SubmitSkillTestAPI(APIView):
 
         return Response(result)
 
+# the questions only change with a deploy
+PERSONALITY_QUESTIONS_VERSION = hashlib.sha256(
+    json.dumps(PERSONALITY_QUESTIONS, sort_keys=True).encode("utf-8")
+).hexdigest()
+
+
 class PersonalityQuestionsAPI(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_get(lambda request: PERSONALITY_QUESTIONS_VERSION)
     def get(self, request):
         return Response(PERSONALITY_QUESTIONS)
 
@@ -66,9 +105,54 @@ class SubmitPersonalityAPI(APIView):
             request.data.get("answers", {})
         )
         return Response(result)
+def _report_version(request):
+    # generated_at moves on every save of the report
+    return StudentReport.objects.filter(student__user_id=request.user.id)\
+                                .values_list("generated_at", flat=True)\
+                                .first()
+
+
 class RecommendationAPI(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_get(_report_version)
     def get(self, request):
         data = get_recommendation(request.user.id)
         return Response(data)
+
+
+
+class JobStatusAPI(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        try:
+            job = BackgroundJob.objects.get(id=job_id, user=request.user)
+        except BackgroundJob.DoesNotExist:
+            return Response(
+                {"error": "Job not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        # clients poll this; a server-side polling stream would hold a
+        # sync worker for the whole job
+        return Response(get_job_status(job))
+
+
+class LLMMetricsAPI(APIView):
+    """Per-prompt LLM latency/token histograms, summed over web and worker processes."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        snapshot = llm_metrics.shared_snapshot()
+
+        if request.query_params.get("prometheus"):
+            return HttpResponse(
+                llm_metrics.prometheus(snapshot),
+                content_type="text/plain; version=0.0.4"
+            )
+
+        return Response({
+            "prompts": snapshot,
+            "cache": llm_cache.stats(),
+        })